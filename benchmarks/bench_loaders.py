@@ -0,0 +1,227 @@
+"""
+Benchmark the ``load_cebl_*`` functions against a local HTTP stand-in.
+
+Synthetic release assets shaped like the cebl data releases (the columns
+documented by each loader, one pbp file per season) are generated in a
+temporary directory and served over HTTP on localhost. Each loader is run
+with an empty cache (cold), with a populated on-disk cache (warm), and all
+datasets are loaded together with ``load_cebl_all`` (multi-season). Wall
+time, peak memory, bytes transferred and rows per second are reported for
+each run. Peak memory is measured with tracemalloc in a separate run, so
+tracing does not slow down the timed one. It sees Python and NumPy
+allocations but not pyarrow's.
+
+Usage::
+
+    python benchmarks/bench_loaders.py
+    python benchmarks/bench_loaders.py --games 20 --save baseline.json
+    python benchmarks/bench_loaders.py --compare baseline.json
+"""
+import argparse
+import functools
+import http.server
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RELEASES = {
+    "schedule": ("schedule", "cebl_schedule.csv", 1),
+    "team_boxscore": ("team-boxscore", "cebl_teams.csv", 2),
+    "player_boxscore": ("player-boxscore", "cebl_players.csv", 26),
+    "officials": ("officials", "cebl_officials.csv", 3),
+    "coaches": ("coaches", "cebl_coaches.csv", 8),
+}
+# columns with few distinct values, like team names or action types
+VOCABULARY_SIZE = 40
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        while chunk := source.read(1024 * 1024):
+            outputfile.write(chunk)
+            with self.server.lock:
+                self.server.bytes_sent += len(chunk)
+
+
+def documented_columns(loader):
+    """Return the (name, type) pairs of the column table in a loader docstring."""
+    table = loader.__doc__.split("Column Name")[1].split("Examples")[0]
+    return re.findall(r"^\s+([a-z_0-9]+)\s+(int|float|str|bool|datetime)\s*$", table, re.MULTILINE)
+
+
+def synthetic_frame(columns, game_ids, rows_per_game, season, rng):
+    n = len(game_ids) * rows_per_game
+    data = {}
+    for name, kind in columns:
+        if name in data:
+            continue
+        if name in ("game_id", "fiba_id"):
+            data[name] = np.repeat(game_ids, rows_per_game)
+        elif name == "season":
+            data[name] = np.full(n, season)
+        elif name == "action_number":
+            data[name] = np.tile(np.arange(1, rows_per_game + 1), len(game_ids))
+        elif kind == "int":
+            data[name] = rng.integers(0, 100, n)
+        elif kind == "float":
+            data[name] = rng.random(n) * 100
+        elif kind == "bool":
+            data[name] = rng.random(n) < 0.5
+        elif kind == "datetime":
+            data[name] = pd.Timestamp(f"{season}-05-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h")
+        else:
+            data[name] = np.char.add(f"{name}_", rng.integers(0, VOCABULARY_SIZE, n).astype(str))
+    return pd.DataFrame(data)
+
+
+def write_releases(root, ceblpy, seasons, games, pbp_events):
+    rng = np.random.default_rng(0)
+    loaders = {
+        "schedule": ceblpy.load_cebl_schedule,
+        "team_boxscore": ceblpy.load_cebl_team_boxscore,
+        "player_boxscore": ceblpy.load_cebl_player_boxscore,
+        "officials": ceblpy.load_cebl_officials,
+        "coaches": ceblpy.load_cebl_coaches,
+    }
+    game_ids = {season: (season % 100) * 100000 + np.arange(games) for season in seasons}
+    for dataset, (tag, file, rows_per_game) in RELEASES.items():
+        columns = documented_columns(loaders[dataset])
+        frames = [synthetic_frame(columns, game_ids[s], rows_per_game, s, rng) for s in seasons]
+        (root / tag).mkdir(parents=True)
+        pd.concat(frames).to_csv(root / tag / file, index=False)
+
+    (root / "pbp").mkdir()
+    columns = documented_columns(ceblpy.load_cebl_pbp)
+    for season in seasons:
+        frame = synthetic_frame(columns, game_ids[season], pbp_events, season, rng)
+        frame.to_csv(root / "pbp" / f"cebl_pbp_{season}.csv", index=False)
+
+
+def measure(server, func, prepare=None):
+    """
+    Time ``func``, then run it again to measure its peak memory.
+
+    Tracing allocations slows the loads down several times, so the timed
+    run has tracemalloc off. ``prepare`` is called before each run to start
+    both from the same cache state.
+    """
+    if prepare is not None:
+        prepare()
+    server.bytes_sent = 0
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    transferred = server.bytes_sent
+    rows = sum(len(df) for df in result.values()) if isinstance(result, dict) else len(result)
+    del result
+
+    if prepare is not None:
+        prepare()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "peak_mb": round(peak / 1024 ** 2, 2),
+        "transferred_mb": round(transferred / 1024 ** 2, 2),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds) if seconds else None,
+    }
+
+
+def run(args):
+    tmp = Path(tempfile.mkdtemp(prefix="ceblpy-bench-"))
+    root = tmp / "releases"
+    root.mkdir()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=root))
+    server.lock = threading.Lock()
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # the release URL is read when ceblpy is imported
+    os.environ["CEBLPY_RELEASES_URL"] = f"http://127.0.0.1:{server.server_port}"
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    from ceblpy import cache, ceblpy, memo
+
+    seasons = list(range(2019, datetime.now().year + 1))
+    write_releases(root, ceblpy, seasons, args.games, args.pbp_events)
+    cache.set_cache_options(cache_dir=tmp / "cache", offline=False, enabled=True, max_age=0)
+    memo.set_memory_cache_options(max_bytes=0)
+
+    loaders = {
+        "schedule": ceblpy.load_cebl_schedule,
+        "team_boxscore": ceblpy.load_cebl_team_boxscore,
+        "player_boxscore": ceblpy.load_cebl_player_boxscore,
+        "officials": ceblpy.load_cebl_officials,
+        "coaches": ceblpy.load_cebl_coaches,
+        "pbp": ceblpy.load_cebl_pbp,
+    }
+    results = {}
+    for name, loader in loaders.items():
+        results[f"{name}/cold"] = measure(server, loader, prepare=cache.clear_cache)
+        results[f"{name}/warm"] = measure(server, loader)
+        results[f"{name}/single-season"] = measure(server, functools.partial(loader, seasons[-1]))
+    results["all/multi-season-cold"] = measure(server, ceblpy.load_cebl_all, prepare=cache.clear_cache)
+    results["all/multi-season-warm"] = measure(server, ceblpy.load_cebl_all)
+
+    server.shutdown()
+    return results
+
+
+def report(results, baseline=None, threshold=0.2):
+    regressions = []
+    header = f"{'benchmark':36} {'seconds':>9} {'peak MB':>9} {'sent MB':>9} {'rows/s':>12}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:36} {r['seconds']:9.3f} {r['peak_mb']:9.1f} {r['transferred_mb']:9.1f} {r['rows_per_second'] or 0:12,}"
+        if baseline and name in baseline:
+            ratio = r["seconds"] / baseline[name]["seconds"] if baseline[name]["seconds"] else 1
+            line += f" {ratio:7.2f}x"
+            if ratio > 1 + threshold:
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--games", type=int, default=100, help="games per season (default 100)")
+    parser.add_argument("--pbp-events", type=int, default=450, help="pbp events per game (default 450)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown reported as a regression when comparing (default 0.2)")
+    args = parser.parse_args()
+
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    regressions = report(results, baseline, args.threshold)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"games": args.games, "pbp_events": args.pbp_events, "results": results}, f, indent=2)
+    if regressions:
+        print(f"\nregressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
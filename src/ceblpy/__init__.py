@@ -1,3 +1,35 @@
-# read version from installed package
-from importlib.metadata import version
-__version__ = version("ceblpy")
\ No newline at end of file
+# attributes are resolved on first access, so that `import ceblpy` stays
+# cheap and does not import pandas
+import importlib
+
+# public name -> module defining it
+_ATTRIBUTES = {
+    "add_hook": "instrument",
+    "remove_hook": "instrument",
+    "reset_stats": "instrument",
+    "stats": "instrument",
+    "CeblDataset": "query",
+    "dataset": "query",
+}
+_SUBMODULES = ("aggregates", "aio", "cache", "ceblpy", "cli", "helpers", "instrument", "joins", "lineups", "memo", "query", "shots", "store")
+
+__all__ = ["__version__", *_ATTRIBUTES]
+
+
+def __getattr__(name):
+    if name == "__version__":
+        # read version from installed package
+        from importlib.metadata import version
+        globals()["__version__"] = version("ceblpy")
+        return globals()["__version__"]
+    if name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULES))
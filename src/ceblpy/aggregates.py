@@ -0,0 +1,289 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import ceblpy
+from . import helpers as h
+
+# counting stats summed into the season totals of players and teams
+_TOTALS = [
+    "points",
+    "field_goals_made",
+    "field_goals_attempted",
+    "three_point_field_goals_made",
+    "three_point_field_goals_attempted",
+    "free_throws_made",
+    "free_throws_attempted",
+    "offensive_rebounds",
+    "defensive_rebounds",
+    "rebounds",
+    "assists",
+    "turnovers",
+    "steals",
+    "blocks",
+    "personal_fouls",
+]
+_GROUPS = {
+    "player_boxscore": ["season", "team_name", "player_name"],
+    "team_boxscore": ["season", "team_name"],
+}
+_COLUMNS = {
+    "player_boxscore": ["game_id", "season", "team_name", "player_name", "minutes", *_TOTALS, "plus_minus"],
+    "team_boxscore": ["game_id", "season", "team_name", "minutes", "team_score", *_TOTALS[1:]],
+}
+# minutes played by a team in a regulation game, used when a boxscore has none
+_TEAM_GAME_SECONDS = 5 * 40 * 60
+
+# (dataset, season) -> {"rows": boxscore rows, "totals": season totals}
+_seasons = {}
+_lock = threading.RLock()
+
+
+def player_season_stats(seasons=None, career=False):
+    """
+    Per-player season or career aggregates of CEBL player boxscores.
+
+    Season totals are computed in a single grouped pass over the boxscores
+    of each season and cached, so later calls only derive the averages and
+    rates. Use :func:`update_season_stats` to fold in new games.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to aggregate. By default, None aggregates all available seasons.
+    career : bool, default False
+        If True, sum the requested seasons of each player into a single row.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per season, team and player, or per player if ``career`` is
+        True, with the number of ``games`` played, ``minutes``, the totals
+        and ``<stat>_per_game`` averages of the counting stats, and:
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        effective_field_goal_percentage    float
+        true_shooting_percentage           float
+        usage_percentage                   float
+        ================================  ===========
+
+    Examples
+    --------
+    >>> player_season_stats(2024)
+    >>> player_season_stats(career=True)
+    """
+    seasons = h.parse_seasons(seasons)
+    players = _season_totals("player_boxscore", seasons)
+    teams = _season_totals("team_boxscore", seasons)
+    context = ["seconds", "field_goals_attempted", "free_throws_attempted", "turnovers"]
+    totals = players.join(teams[context].add_prefix("team_"), on=["season", "team_name"])
+    if career:
+        totals = _career(totals, ["player_name"])
+    totals = totals.reset_index()
+
+    stats = _rates(totals)
+    # share of the team possessions used while on court
+    used = totals["field_goals_attempted"] + 0.44 * totals["free_throws_attempted"] + totals["turnovers"]
+    team_used = (totals["team_field_goals_attempted"] + 0.44 * totals["team_free_throws_attempted"]
+                 + totals["team_turnovers"])
+    stats["usage_percentage"] = _ratio(100 * used * totals["team_seconds"] / 5, totals["seconds"] * team_used)
+    return stats.drop(columns=["team_" + c for c in context])
+
+
+def team_season_stats(seasons=None, career=False):
+    """
+    Per-team season or career aggregates of CEBL team boxscores.
+
+    Season totals are computed in a single grouped pass over the boxscores
+    of each season and cached, so later calls only derive the averages and
+    rates. Possessions are estimated as field goal attempts, plus 0.44 free
+    throw attempts and turnovers, minus offensive rebounds, averaged with
+    the opponent. Use :func:`update_season_stats` to fold in new games.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to aggregate. By default, None aggregates all available seasons.
+    career : bool, default False
+        If True, sum the requested seasons of each team into a single row.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per season and team, or per team if ``career`` is True,
+        with the number of ``games``, ``minutes``, the totals and
+        ``<stat>_per_game`` averages of the counting stats, the
+        ``opponent_points`` and ``possessions``, and:
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        effective_field_goal_percentage    float
+        true_shooting_percentage           float
+        pace                               float
+        offensive_rating                   float
+        defensive_rating                   float
+        net_rating                         float
+        ================================  ===========
+
+    Examples
+    --------
+    >>> team_season_stats(2024)
+    """
+    seasons = h.parse_seasons(seasons)
+    totals = _season_totals("team_boxscore", seasons)
+    if career:
+        totals = _career(totals, ["team_name"])
+    totals = totals.reset_index()
+
+    stats = _rates(totals)
+    # possessions per 40 minutes
+    stats["pace"] = _ratio(40 * 60 * totals["possessions"], totals["seconds"] / 5)
+    stats["offensive_rating"] = _ratio(100 * totals["points"], totals["possessions"])
+    stats["defensive_rating"] = _ratio(100 * totals["opponent_points"], totals["possessions"])
+    stats["net_rating"] = stats["offensive_rating"] - stats["defensive_rating"]
+    return stats
+
+
+def update_season_stats(season=None):
+    """
+    Fold new or corrected games of a season into the cached aggregates.
+
+    The boxscores of ``season`` are loaded again and compared with the
+    cached ones, and only the totals of the players and teams appearing in
+    new or changed rows (and the opponents of those teams) are recomputed.
+    Seasons that were never aggregated are left alone, they are computed
+    when first requested.
+
+    Parameters
+    ----------
+    season : int, optional
+        Season to update. By default, the current season.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> update_season_stats()
+    """
+    if season is None:
+        season = datetime.now().year
+    for dataset in _GROUPS:
+        with _lock:
+            entry = _seasons.get((dataset, season))
+        if entry is None:
+            continue
+        rows, delta = ceblpy.refresh_cebl_data(entry["rows"], dataset, season)
+        if len(delta):
+            totals = _update(dataset, entry["totals"], rows, delta)
+            with _lock:
+                _seasons[(dataset, season)] = {"rows": rows, "totals": totals}
+
+
+def clear_season_stats():
+    """
+    Remove every cached season aggregate.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> clear_season_stats()
+    """
+    with _lock:
+        _seasons.clear()
+
+
+def _season_totals(dataset, seasons):
+    with _lock:
+        missing = [season for season in seasons if (dataset, season) not in _seasons]
+    if missing:
+        rows = ceblpy._LOADERS[dataset](missing, columns=_COLUMNS[dataset])
+        with _lock:
+            for season in missing:
+                season_rows = rows[rows["season"] == season]
+                _seasons[(dataset, season)] = {"rows": season_rows, "totals": _totals(dataset, season_rows)}
+    with _lock:
+        frames = [_seasons[(dataset, season)]["totals"] for season in seasons]
+    return pd.concat(frames)
+
+
+def _totals(dataset, rows):
+    # one row per game and player or team, then a single grouped sum
+    games = _team_games(rows) if dataset == "team_boxscore" else _player_games(rows)
+    return games.groupby(_GROUPS[dataset], sort=True).sum()
+
+
+def _player_games(rows):
+    games = rows[_GROUPS["player_boxscore"]].copy()
+    seconds = np.nan_to_num(h.clock_seconds(rows["minutes"]))
+    games["games"] = (seconds > 0).astype(np.int64)
+    games["seconds"] = seconds
+    for column in _TOTALS + ["plus_minus"]:
+        games[column] = rows[column].fillna(0).to_numpy()
+    return games
+
+
+def _team_games(rows):
+    games = rows[["game_id", *_GROUPS["team_boxscore"]]].copy()
+    games["games"] = np.int64(1)
+    seconds = h.clock_seconds(rows["minutes"])
+    games["seconds"] = np.where(np.isnan(seconds) | (seconds == 0), _TEAM_GAME_SECONDS, seconds)
+    for column in _TOTALS:
+        source = "team_score" if column == "points" else column
+        games[column] = rows[source].fillna(0).to_numpy()
+    games["estimated_possessions"] = (games["field_goals_attempted"] + 0.44 * games["free_throws_attempted"]
+                                      - games["offensive_rebounds"] + games["turnovers"])
+
+    opponents = games[["game_id", "team_name", "points", "estimated_possessions"]]
+    games = games.merge(opponents, on="game_id", suffixes=("", "_opponent"))
+    games = games[games["team_name"] != games["team_name_opponent"]]
+    games["opponent_points"] = games.pop("points_opponent")
+    games["possessions"] = (games["estimated_possessions"] + games.pop("estimated_possessions_opponent")) / 2
+    return games.drop(columns=["game_id", "team_name_opponent", "estimated_possessions"])
+
+
+def _update(dataset, totals, rows, delta):
+    groups = _GROUPS[dataset]
+    if dataset == "team_boxscore":
+        # the opponents of a changed team game see their defense change too
+        affected = pd.MultiIndex.from_frame(rows.loc[rows["game_id"].isin(delta["game_id"]), groups])
+        teams = pd.MultiIndex.from_frame(rows[groups]).isin(affected)
+        recomputed = _totals(dataset, rows[rows["game_id"].isin(rows.loc[teams, "game_id"])])
+        recomputed = recomputed[recomputed.index.isin(affected)]
+    else:
+        affected = pd.MultiIndex.from_frame(delta[groups])
+        recomputed = _totals(dataset, rows[pd.MultiIndex.from_frame(rows[groups]).isin(affected)])
+    kept = totals[~totals.index.isin(affected)]
+    return pd.concat([kept, recomputed]).sort_index()
+
+
+def _career(totals, groups):
+    totals = totals.reset_index()
+    seasons = totals.groupby(groups)["season"].nunique().rename("seasons")
+    numeric = totals.drop(columns=[c for c in ("season", "team_name") if c not in groups])
+    return numeric.groupby(groups, sort=True).sum().join(seasons)
+
+
+def _rates(totals):
+    stats = totals.copy()
+    stats.insert(stats.columns.get_loc("seconds"), "minutes", stats.pop("seconds") / 60)
+    for column in ["minutes", *_TOTALS]:
+        stats[f"{column}_per_game"] = _ratio(stats[column], stats["games"])
+    made = stats["field_goals_made"] + 0.5 * stats["three_point_field_goals_made"]
+    stats["effective_field_goal_percentage"] = _ratio(100 * made, stats["field_goals_attempted"])
+    attempts = 2 * (stats["field_goals_attempted"] + 0.44 * stats["free_throws_attempted"])
+    stats["true_shooting_percentage"] = _ratio(100 * stats["points"], attempts)
+    return stats
+
+
+def _ratio(numerator, denominator):
+    return numerator.astype(float).div(denominator.astype(float).where(denominator != 0))
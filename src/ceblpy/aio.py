@@ -0,0 +1,385 @@
+"""
+Asynchronous counterparts of the ``load_cebl_*`` functions.
+
+Downloads go through a pooled, keep-alive ``aiohttp`` session, while disk
+writes, cache bookkeeping and parsing run in the default executor, so
+loads do not block the event loop and several datasets or seasons can be
+fetched concurrently. Requires the optional ``aiohttp`` dependency.
+"""
+import asyncio
+import contextlib
+import functools
+import hashlib
+import io
+
+import pandas as pd
+
+from . import cache
+from . import helpers as h
+from . import instrument
+from . import store
+from .ceblpy import _URLS
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# maximum number of connections of the sessions opened by the loaders
+CONNECTION_LIMIT = 8
+
+
+async def load_cebl_schedule(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL schedule data from the cebl data repository.
+
+    See :func:`ceblpy.ceblpy.load_cebl_schedule` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the download. Pass a long-lived session to reuse its
+        pooled connections across calls. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The schedule of the requested seasons.
+
+    Examples
+    --------
+    >>> await load_cebl_schedule(2024)
+    """
+    return await _load_release("schedule", seasons, columns, compact, session)
+
+
+async def load_cebl_team_boxscore(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL team boxscore data from the cebl data repository.
+
+    See :func:`ceblpy.ceblpy.load_cebl_team_boxscore` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the download. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The team boxscores of the requested seasons.
+
+    Examples
+    --------
+    >>> await load_cebl_team_boxscore(2024)
+    """
+    return await _load_release("team_boxscore", seasons, columns, compact, session)
+
+
+async def load_cebl_player_boxscore(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL player boxscore data from the cebl data repository.
+
+    See :func:`ceblpy.ceblpy.load_cebl_player_boxscore` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the download. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The player boxscores of the requested seasons.
+
+    Examples
+    --------
+    >>> await load_cebl_player_boxscore(2024)
+    """
+    return await _load_release("player_boxscore", seasons, columns, compact, session)
+
+
+async def load_cebl_officials(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL officials data from the cebl data repository.
+
+    See :func:`ceblpy.ceblpy.load_cebl_officials` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the download. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The officials of the requested seasons.
+
+    Examples
+    --------
+    >>> await load_cebl_officials(2024)
+    """
+    return await _load_release("officials", seasons, columns, compact, session)
+
+
+async def load_cebl_coaches(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL coaches data from the cebl data repository.
+
+    See :func:`ceblpy.ceblpy.load_cebl_coaches` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the download. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The coaches of the requested seasons.
+
+    Examples
+    --------
+    >>> await load_cebl_coaches(2024)
+    """
+    return await _load_release("coaches", seasons, columns, compact, session)
+
+
+async def load_cebl_pbp(seasons=None, columns=None, compact=False, session=None):
+    """
+    Asynchronously load cleaned CEBL pbp data from the cebl data repository.
+
+    All seasons are downloaded concurrently. See
+    :func:`ceblpy.ceblpy.load_cebl_pbp` for the columns.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the downloads. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The pbp of the requested seasons, in season order.
+
+    Examples
+    --------
+    >>> await load_cebl_pbp([2023, 2024])
+    """
+    seasons = h.parse_seasons(seasons)
+    h.validate_columns(columns)
+    urls = [_URLS["pbp"].format(season=season) for season in seasons]
+    async with _session(session) as s:
+        sources = await asyncio.gather(*(fetch(url, s) for url in urls))
+    frames = await asyncio.gather(*(
+        _run(store.read_asset, url, columns=columns, path=source) for url, source in zip(urls, sources)
+    ))
+    with instrument.stage("concat") as record:
+        pbp = pd.concat(frames) if frames else pd.DataFrame()
+        record["rows"] = len(pbp)
+    if compact:
+        pbp = await _run(h.compact_dtypes, pbp)
+    return pbp
+
+
+async def load_cebl_all(seasons=None, datasets=None, compact=False, session=None):
+    """
+    Asynchronously load several cleaned CEBL datasets at once.
+
+    Seasons are validated once and every download runs concurrently over a
+    single session. See :func:`ceblpy.ceblpy.load_cebl_all`.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+    datasets : list of str, optional
+        Datasets to load. By default, all datasets are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes.
+    session : aiohttp.ClientSession, optional
+        Session used for the downloads. By default, a session is opened for
+        the call.
+
+    Returns
+    -------
+    dict of pandas.DataFrame
+        The requested datasets, keyed by name.
+
+    Examples
+    --------
+    >>> data = await load_cebl_all(2024)
+    """
+    seasons = h.parse_seasons(seasons)
+    datasets = h.parse_datasets(datasets)
+
+    async with _session(session) as s:
+        loads = [
+            load_cebl_pbp(seasons, compact=compact, session=s) if dataset == "pbp"
+            else _load_release(dataset, seasons, None, compact, s)
+            for dataset in datasets
+        ]
+        frames = await asyncio.gather(*loads)
+    return dict(zip(datasets, frames))
+
+
+async def fetch(url, session):
+    """
+    Asynchronously return a local copy of a release asset, downloading it if needed.
+
+    Counterpart of :func:`ceblpy.cache.fetch` sharing the same on-disk cache.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    session : aiohttp.ClientSession
+        Session used for the download.
+
+    Returns
+    -------
+    str or io.BytesIO
+        Path of the cached asset, or the downloaded asset itself if the cache
+        is disabled.
+
+    Examples
+    --------
+    >>> async with aiohttp.ClientSession() as session:
+    ...     path = await fetch(url, session)
+    """
+    if not cache.get_cache_options()["enabled"]:
+        headers = None if session.auto_decompress else {"Accept-Encoding": "identity"}
+        async with session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            return io.BytesIO(await response.read())
+
+    # disk I/O runs in the executor, so the event loop only waits on it
+    path, meta, headers = await _run(cache._prepare, url)
+    if headers is None:
+        return str(path)
+
+    if session.auto_decompress:
+        # let aiohttp negotiate the encodings it decodes itself
+        del headers["Accept-Encoding"]
+    with instrument.stage("download", url) as record:
+        try:
+            for source in cache._sources(url, meta):
+                async with session.get(source, headers=headers) as response:
+                    if response.status == 404 and source != url:
+                        # compressed variants may not be published
+                        continue
+                    if response.status == 304 and meta is not None:
+                        await _run(cache._revalidated, path, meta)
+                    else:
+                        response.raise_for_status()
+                        digest = hashlib.sha256()
+                        async with _part_file(path) as f:
+                            async for chunk in response.content.iter_chunked(1024 * 1024):
+                                await _run(_write_chunk, f, digest, chunk)
+                                record["bytes"] += len(chunk)
+                        encoding = cache._encoding(source, response.headers.get("Content-Encoding"),
+                                                   decoded=session.auto_decompress)
+                        await _run(cache._commit, path, url, response.headers, source, encoding,
+                                   digest.hexdigest())
+                break
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if meta is None:
+                raise
+            await _run(cache._fall_back, url, path, meta, e)
+
+    await _run(cache._evict, keep=path)
+    return str(path)
+
+
+async def _load_release(dataset, seasons, columns, compact, session):
+    seasons = h.parse_seasons(seasons)
+    h.validate_columns(columns)
+    url = _URLS[dataset]
+    async with _session(session) as s:
+        source = await fetch(url, s)
+    df = await _run(store.read_seasons, url, seasons, columns=columns, path=source)
+    if compact:
+        df = await _run(h.compact_dtypes, df)
+    return df
+
+
+@contextlib.asynccontextmanager
+async def _session(session):
+    if aiohttp is None:
+        raise ImportError("ceblpy.aio requires aiohttp, install it with `pip install ceblpy[aio]`")
+    if session is not None:
+        yield session
+        return
+    # compressed responses are cached as received and decompressed while parsed
+    connector = aiohttp.TCPConnector(limit=CONNECTION_LIMIT)
+    async with aiohttp.ClientSession(connector=connector, auto_decompress=False) as s:
+        yield s
+
+
+@contextlib.asynccontextmanager
+async def _part_file(path):
+    """
+    Counterpart of :func:`ceblpy.cache._part_file` opening, replacing and
+    removing the file in the executor.
+    """
+    part = cache._part_file(path)
+    f = await _run(part.__enter__)
+    try:
+        yield f
+    except BaseException as e:
+        await _run(part.__exit__, type(e), e, e.__traceback__)
+        raise
+    await _run(part.__exit__, None, None, None)
+
+
+def _write_chunk(f, digest, chunk):
+    # hashed while written, so the file is not read again to record its checksum
+    f.write(chunk)
+    digest.update(chunk)
+
+
+async def _run(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,579 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import warnings
+from pathlib import Path
+from urllib.parse import urlparse
+
+from . import instrument
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ceblpy")
+
+
+_options = {
+    "cache_dir": os.environ.get("CEBLPY_CACHE_DIR") or _default_cache_dir(),
+    "max_size": int(os.environ.get("CEBLPY_CACHE_MAX_SIZE", 2 * 1024 ** 3)),
+    "offline": os.environ.get("CEBLPY_OFFLINE", "").lower() in ("1", "true", "yes"),
+    "enabled": os.environ.get("CEBLPY_CACHE", "1").lower() not in ("0", "false", "no"),
+    "max_age": float(os.environ.get("CEBLPY_CACHE_MAX_AGE", 0)),
+    "compressed_variants": os.environ.get("CEBLPY_COMPRESSED_VARIANTS", "").lower() in ("1", "true", "yes"),
+}
+_lock = threading.Lock()
+
+# encodings that can be stored compressed and read by pandas, in order of preference,
+# with the suffix of the compressed variants of an asset
+_ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def set_cache_options(cache_dir=None, max_size=None, offline=None, enabled=None, max_age=None,
+                      compressed_variants=None):
+    """
+    Configure the on-disk cache used by the ``load_cebl_*`` functions.
+
+    Options left as None keep their current value. Defaults can also be set
+    with the ``CEBLPY_CACHE_DIR``, ``CEBLPY_CACHE_MAX_SIZE``, ``CEBLPY_OFFLINE``,
+    ``CEBLPY_CACHE``, ``CEBLPY_CACHE_MAX_AGE`` and ``CEBLPY_COMPRESSED_VARIANTS``
+    environment variables.
+
+    Parameters
+    ----------
+    cache_dir : str or path-like, optional
+        Directory where downloaded release assets are stored.
+    max_size : int, optional
+        Maximum total size of cached assets in bytes. The least recently used
+        assets are evicted once the limit is exceeded.
+    offline : bool, optional
+        If True, assets are served from the cache without touching the network.
+    enabled : bool, optional
+        If False, every call downloads directly from the cebl data repository.
+    max_age : float, optional
+        Number of seconds during which a cached asset is used without being
+        revalidated. By default (0), assets are revalidated on every load.
+    compressed_variants : bool, optional
+        If True, the first download of an asset tries its ``.zst`` (with the
+        optional ``zstandard`` dependency) and ``.gz`` variants before the
+        asset itself. Useful with mirrors publishing compressed assets.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> set_cache_options(cache_dir="/tmp/ceblpy", max_size=500 * 1024 ** 2)
+    >>> set_cache_options(offline=True)
+    """
+    if cache_dir is not None:
+        _options["cache_dir"] = os.fspath(cache_dir)
+    if max_size is not None:
+        if not isinstance(max_size, int) or max_size < 0:
+            raise ValueError(f"Expected max_size to be a non-negative int, got {max_size!r}")
+        _options["max_size"] = max_size
+    if offline is not None:
+        _options["offline"] = bool(offline)
+    if enabled is not None:
+        _options["enabled"] = bool(enabled)
+    if max_age is not None:
+        if max_age < 0:
+            raise ValueError(f"Expected max_age to be non-negative, got {max_age!r}")
+        _options["max_age"] = float(max_age)
+    if compressed_variants is not None:
+        _options["compressed_variants"] = bool(compressed_variants)
+
+
+def get_cache_options():
+    """
+    Return a copy of the current cache options.
+
+    Returns
+    -------
+    dict
+        The ``cache_dir``, ``max_size``, ``offline``, ``enabled``, ``max_age``
+        and ``compressed_variants`` options.
+
+    Examples
+    --------
+    >>> get_cache_options()["cache_dir"]
+    """
+    return dict(_options)
+
+
+def clear_cache():
+    """
+    Remove every asset stored in the cache directory.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> clear_cache()
+    """
+    with _lock:
+        for path in _asset_files():
+            _remove_asset(path)
+        # interrupted first downloads have no asset to be removed with
+        for path in Path(_options["cache_dir"], "assets").glob("*/*.partial*"):
+            path.unlink(missing_ok=True)
+
+
+def fetch(url, revalidate=False):
+    """
+    Return a local path for a release asset, downloading it if needed.
+
+    Cached assets are revalidated with a conditional request using the stored
+    ETag and Last-Modified headers, so unchanged assets are not downloaded
+    again. In offline mode the cached copy is returned without any request.
+    Interrupted downloads are kept and resumed by the next call with a
+    Range request, and downloads shorter than announced are rejected.
+
+    Compressed transfers are negotiated with the server, and compressed
+    assets are stored as downloaded: they are decompressed while being
+    parsed, never written to disk uncompressed. See :func:`asset_encoding`.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    revalidate : bool, default False
+        If True, revalidate a cached asset with the server even in offline
+        mode or within ``max_age`` (see :func:`set_cache_options`).
+
+    Returns
+    -------
+    str
+        Path of the cached asset, or ``url`` itself if the cache is disabled.
+
+    Examples
+    --------
+    >>> fetch("https://github.com/ryanndu/cebl-data/releases/download/schedule/cebl_schedule.csv")
+    """
+    if not _options["enabled"]:
+        return url
+
+    path, meta, headers = _prepare(url, revalidate)
+    if headers is None:
+        return str(path)
+
+    with instrument.stage("download", url) as record:
+        try:
+            for source in _sources(url, meta):
+                try:
+                    response, partial = _open_source(path, source, headers)
+                except urllib.error.HTTPError as e:
+                    # compressed variants may not be published
+                    if e.code == 404 and source != url:
+                        continue
+                    raise
+                with response:
+                    record["bytes"] = _download(response, path, url, source, partial)
+                break
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or meta is None:
+                raise
+            _revalidated(path, meta)
+        except urllib.error.URLError as e:
+            if meta is None:
+                raise
+            _fall_back(url, path, meta, e.reason)
+
+    _evict(keep=path)
+    return str(path)
+
+
+def verify(url):
+    """
+    Check a cached asset against the size and checksum recorded when it was downloaded.
+
+    A copy that does not match is removed, so the next :func:`fetch`
+    downloads it again.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+
+    Returns
+    -------
+    bool
+        True if the asset is cached and intact.
+
+    Examples
+    --------
+    >>> if not verify(url):
+    ...     fetch(url)
+    """
+    path = _asset_path(url)
+    meta = _read_meta(path) if path.exists() else None
+    if meta is None:
+        return False
+    intact = path.stat().st_size == meta.get("size") and meta.get("sha256") in (None, _file_digest(path))
+    if not intact:
+        with _lock:
+            _remove_asset(path)
+    return intact
+
+
+def asset_encoding(path):
+    """
+    Return the compression of a cached asset.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the cached asset, as returned by :func:`fetch`.
+
+    Returns
+    -------
+    str or None
+        "gzip" or "zstd", as accepted by the ``compression`` argument of
+        :func:`pandas.read_csv`, or None if the asset is stored uncompressed.
+
+    Examples
+    --------
+    >>> pd.read_csv(path, compression=asset_encoding(path))
+    """
+    meta = _read_meta(Path(path))
+    return meta.get("encoding") if meta else None
+
+
+def derived_path(path, suffix):
+    """
+    Return the path of a file derived from a cached asset.
+
+    Derived files (metadata, columnar copies) are stored next to the asset
+    and are evicted together with it.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the cached asset, as returned by :func:`fetch`.
+    suffix : str
+        Suffix appended to the asset name (e.g. ``".parquet"``).
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the derived file.
+
+    Examples
+    --------
+    >>> derived_path(fetch(url), ".parquet")
+    """
+    path = Path(path)
+    return path.with_name(path.name + suffix)
+
+
+def _asset_path(url):
+    # release assets live at .../releases/download/<tag>/<file>
+    parts = [p for p in urlparse(url).path.split("/") if p]
+    return Path(_options["cache_dir"], "assets", *parts[-2:])
+
+
+def _meta_path(path):
+    return derived_path(path, ".json")
+
+
+def _read_meta(path):
+    try:
+        with open(_meta_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(path, meta):
+    # concurrent writers of the same asset each need their own temporary file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, _meta_path(path))
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _touch(path, meta):
+    meta["last_access"] = time.time()
+    _write_meta(path, meta)
+
+
+def _prepare(url, revalidate=False):
+    """
+    Return the cache path and metadata of an asset, and the headers of the
+    request revalidating it (None if the cached copy can be used as is).
+    """
+    path = _asset_path(url)
+    meta = _read_meta(path) if path.exists() else None
+
+    if _options["offline"] and not revalidate:
+        if meta is None:
+            raise FileNotFoundError(f"{url} is not cached and offline mode is enabled")
+        _touch(path, meta)
+        return path, meta, None
+    if meta is not None and not revalidate and time.time() - meta.get("validated_at", 0) < _options["max_age"]:
+        _touch(path, meta)
+        return path, meta, None
+
+    headers = {"Accept-Encoding": ", ".join(_accepted_encodings())}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return path, meta, headers
+
+
+def _accepted_encodings():
+    return [e for e in _ENCODINGS if e != "zstd" or zstandard is not None]
+
+
+def _sources(url, meta):
+    """
+    Return the URLs to try, in order, to download an asset.
+    """
+    if meta is not None:
+        return list(dict.fromkeys([meta.get("source", url), url]))
+    if _options["compressed_variants"]:
+        return [url + _ENCODINGS[e] for e in _accepted_encodings()] + [url]
+    return [url]
+
+
+def _encoding(source, content_encoding, decoded=False):
+    """
+    Return the compression of the bytes downloaded from ``source``.
+    """
+    if content_encoding:
+        content_encoding = content_encoding.strip().lower()
+        if decoded or content_encoding not in _ENCODINGS:
+            return None
+        return content_encoding
+    for encoding, suffix in _ENCODINGS.items():
+        if source.endswith(suffix):
+            return encoding
+    return None
+
+
+def _revalidated(path, meta):
+    meta["validated_at"] = time.time()
+    _touch(path, meta)
+
+
+def _fall_back(url, path, meta, reason):
+    warnings.warn(f"Could not revalidate {url} ({reason}), using cached copy")
+    _touch(path, meta)
+
+
+def _download(response, path, url, source, partial=None):
+    resumed = partial is not None and response.status == 206
+    if partial is not None and not resumed:
+        # the asset changed, or the server ignored the range
+        _release_partial(path, partial, discard=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if resumed:
+        tmp = partial["tmp"]
+    else:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        os.close(fd)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, "r+b" if resumed else "wb") as f:
+            if resumed:
+                while chunk := f.read(1024 * 1024):
+                    digest.update(chunk)
+            while chunk := response.read(1024 * 1024):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        expected = response.headers.get("Content-Length")
+        if expected is not None and size != int(expected):
+            raise OSError(f"Incomplete download of {source}: received {size} of {expected} bytes")
+    except BaseException:
+        _keep_partial(path, tmp, source, response.headers)
+        raise
+    os.replace(tmp, path)
+    derived_path(path, ".partial.json").unlink(missing_ok=True)
+    _commit(path, url, response.headers, source, _encoding(source, response.headers.get("Content-Encoding")),
+            digest.hexdigest())
+    return size
+
+
+def _resume_headers(headers, partial):
+    if partial is None:
+        return headers
+    # ranges of encoded responses are not portable, resume identity transfers only
+    return {**headers, "Range": f"bytes={partial['size']}-", "If-Range": partial["validator"],
+            "Accept-Encoding": "identity"}
+
+
+def _open_source(path, source, headers):
+    """
+    Request ``source``, resuming its interrupted download if any. A partial
+    download the server cannot resume (416) is discarded and the asset is
+    requested whole.
+    """
+    partial = _claim_partial(path, source)
+    try:
+        request = urllib.request.Request(source, headers=_resume_headers(headers, partial))
+        return urllib.request.urlopen(request), partial
+    except BaseException as e:
+        code = getattr(e, "code", None)
+        _release_partial(path, partial, discard=code == 416)
+        if code != 416 or partial is None:
+            raise
+    return urllib.request.urlopen(urllib.request.Request(source, headers=headers)), None
+
+
+def _claim_partial(path, source):
+    """
+    Take over the interrupted download of an asset, if any. Only one
+    concurrent download can claim it.
+    """
+    try:
+        with open(derived_path(path, ".partial.json")) as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if info.get("source") != source:
+        return None
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    os.close(fd)
+    try:
+        os.replace(derived_path(path, ".partial"), tmp)
+    except FileNotFoundError:
+        os.unlink(tmp)
+        return None
+    return {"tmp": tmp, "size": os.path.getsize(tmp), "validator": info["validator"]}
+
+
+def _release_partial(path, partial, discard=False):
+    if partial is None:
+        return
+    if discard:
+        os.unlink(partial["tmp"])
+        derived_path(path, ".partial.json").unlink(missing_ok=True)
+    else:
+        os.replace(partial["tmp"], derived_path(path, ".partial"))
+
+
+def _keep_partial(path, tmp, source, headers):
+    # a range can only be resumed against a strong ETag or a Last-Modified date
+    etag = headers.get("ETag")
+    validator = etag if etag and not etag.startswith("W/") else headers.get("Last-Modified")
+    if not validator or headers.get("Content-Encoding") or os.path.getsize(tmp) == 0:
+        os.unlink(tmp)
+        return
+    with open(derived_path(path, ".partial.json"), "w") as f:
+        json.dump({"source": source, "validator": validator}, f)
+    os.replace(tmp, derived_path(path, ".partial"))
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def _part_file(path):
+    """
+    Open a temporary file that replaces ``path`` once fully written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _commit(path, url, headers, source, encoding, sha256=None):
+    now = time.time()
+    _write_meta(path, {
+        "url": url,
+        "source": source,
+        "encoding": encoding,
+        "sha256": sha256 or _file_digest(path),
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "size": path.stat().st_size,
+        "fetched_at": now,
+        "validated_at": now,
+        "last_access": now,
+    })
+
+
+def _asset_files():
+    root = Path(_options["cache_dir"], "assets")
+    if not root.exists():
+        return []
+    return [p for p in root.glob("*/*") if p.is_file() and p.suffix == ".csv"]
+
+
+def _derived_files(path):
+    return list(path.parent.glob(path.name + ".*"))
+
+
+def _asset_size(path):
+    files = [path]
+    for p in _derived_files(path):
+        files.extend(p.rglob("*") if p.is_dir() else [p])
+    size = 0
+    for f in files:
+        try:
+            size += f.stat().st_size if f.is_file() else 0
+        except FileNotFoundError:
+            # temporary files of concurrent writers may disappear
+            pass
+    return size
+
+
+def _remove_asset(path):
+    for p in _derived_files(path) + [path]:
+        try:
+            if p.is_dir():
+                shutil.rmtree(p)
+            else:
+                p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _evict(keep=None):
+    with _lock:
+        entries = []
+        for path in _asset_files():
+            meta = _read_meta(path) or {}
+            entries.append((meta.get("last_access", 0), _asset_size(path), path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= _options["max_size"]:
+                break
+            if path == keep:
+                continue
+            _remove_asset(path)
+            total -= size
@@ -1,9 +1,27 @@
+import os
+import numpy as np
 import pandas as pd
 from . import helpers as h
+from . import instrument
+from . import memo
+from . import store
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# base URL of the cebl data releases, can point to a mirror
+_RELEASES_URL = os.environ.get("CEBLPY_RELEASES_URL", "https://github.com/ryanndu/cebl-data/releases/download").rstrip("/")
+_URLS = {
+    "schedule": f"{_RELEASES_URL}/schedule/cebl_schedule.csv",
+    "team_boxscore": f"{_RELEASES_URL}/team-boxscore/cebl_teams.csv",
+    "player_boxscore": f"{_RELEASES_URL}/player-boxscore/cebl_players.csv",
+    "officials": f"{_RELEASES_URL}/officials/cebl_officials.csv",
+    "coaches": f"{_RELEASES_URL}/coaches/cebl_coaches.csv",
+    "pbp": _RELEASES_URL + "/pbp/cebl_pbp_{season}.csv",
+}
 
-def load_cebl_schedule(seasons=None):
+
+@memo.memoize
+def load_cebl_schedule(seasons=None, columns=None, compact=False, memory_map=False):
     """
     Load cleaned CEBL schedule data from the cebl data repository.
 
@@ -16,6 +34,18 @@ def load_cebl_schedule(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -61,21 +91,14 @@ def load_cebl_schedule(seasons=None):
     >>> load_cebl_schedule([2019, 2020, 2021])
     >>> load_cebl_schedule()
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    schedule = pd.read_csv("https://github.com/ryanndu/cebl-data/releases/download/schedule/cebl_schedule.csv")
-    schedule = schedule[schedule['season'].isin(seasons)]
+    schedule = _read_release(_URLS["schedule"], seasons, columns, compact, memory_map)
     return schedule
 
 
-def load_cebl_team_boxscore(seasons=None):
+@memo.memoize
+def load_cebl_team_boxscore(seasons=None, columns=None, compact=False, memory_map=False):
     """
     Load cleaned CEBL team boxscore data from the cebl data repository.
 
@@ -88,6 +111,18 @@ def load_cebl_team_boxscore(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -179,22 +214,16 @@ def load_cebl_team_boxscore(seasons=None):
     >>> load_cebl_team_boxscore(2020)
     >>> load_cebl_team_boxscore([2019, 2020, 2021])
     >>> load_cebl_team_boxscore()
+    >>> load_cebl_team_boxscore(2024, columns=["game_id", "team_name", "team_score"])
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    team_boxscore = pd.read_csv("https://github.com/ryanndu/cebl-data/releases/download/team-boxscore/cebl_teams.csv")
-    team_boxscore = team_boxscore[team_boxscore['season'].isin(seasons)]
+    team_boxscore = _read_release(_URLS["team_boxscore"], seasons, columns, compact, memory_map)
     return team_boxscore
 
 
-def load_cebl_player_boxscore(seasons=None):
+@memo.memoize
+def load_cebl_player_boxscore(seasons=None, columns=None, compact=False, memory_map=False):
     """
     Load cleaned CEBL player boxscore data from the cebl data repository.
 
@@ -207,6 +236,18 @@ def load_cebl_player_boxscore(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -279,21 +320,14 @@ def load_cebl_player_boxscore(seasons=None):
     >>> load_cebl_player_boxscore([2019, 2020, 2021])
     >>> load_cebl_player_boxscore()
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    player_boxscore = pd.read_csv("https://github.com/ryanndu/cebl-data/releases/download/player-boxscore/cebl_players.csv")
-    player_boxscore = player_boxscore[player_boxscore['season'].isin(seasons)]
+    player_boxscore = _read_release(_URLS["player_boxscore"], seasons, columns, compact, memory_map)
     return player_boxscore
 
 
-def load_cebl_officials(seasons=None):
+@memo.memoize
+def load_cebl_officials(seasons=None, columns=None, compact=False, memory_map=False):
     """
     Load cleaned CEBL officials data from the cebl data repository.
 
@@ -306,6 +340,18 @@ def load_cebl_officials(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -337,21 +383,14 @@ def load_cebl_officials(seasons=None):
     >>> load_cebl_officials([2019, 2020, 2021])
     >>> load_cebl_officials_boxscore()
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    officials = pd.read_csv("https://github.com/ryanndu/cebl-data/releases/download/officials/cebl_officials.csv")
-    officials = officials[officials['season'].isin(seasons)]
+    officials = _read_release(_URLS["officials"], seasons, columns, compact, memory_map)
     return officials
 
 
-def load_cebl_coaches(seasons=None):
+@memo.memoize
+def load_cebl_coaches(seasons=None, columns=None, compact=False, memory_map=False):
     """
     Load cleaned CEBL coaches data from the cebl data repository.
 
@@ -364,6 +403,18 @@ def load_cebl_coaches(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -395,21 +446,14 @@ def load_cebl_coaches(seasons=None):
     >>> load_cebl_coaches([2019, 2020, 2021])
     >>> load_cebl_coaches()
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    coaches = pd.read_csv("https://github.com/ryanndu/cebl-data/releases/download/coaches/cebl_coaches.csv")
-    coaches = coaches[coaches['season'].isin(seasons)]
+    coaches = _read_release(_URLS["coaches"], seasons, columns, compact, memory_map)
     return coaches
 
 
-def load_cebl_pbp(seasons=None):
+@memo.memoize
+def load_cebl_pbp(seasons=None, columns=None, compact=False, max_workers=4, memory_map=False):
     """
     Load cleaned CEBL pbp data from the cebl data repository.
 
@@ -422,6 +466,20 @@ def load_cebl_pbp(seasons=None):
         - None : Load all available seasons
 
         All years must be 2019 or later.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded. Only the
+        requested columns are read from the data.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    max_workers : int, default 4
+        Maximum number of seasons downloaded concurrently.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
 
     Returns
     -------
@@ -469,17 +527,404 @@ def load_cebl_pbp(seasons=None):
     >>> load_cebl_pbp(2020)
     >>> load_cebl_pbp([2019, 2020, 2021])
     >>> load_cebl_pbp()
+    >>> load_cebl_pbp(2024, columns=["game_id", "action_type", "sub_type"], compact=True)
     """
-    if isinstance(seasons, int):
-        seasons = [seasons]
-    if isinstance(seasons, list):
-        h.validate_seasons(seasons)
-    elif seasons is None:
-        seasons = list(range(2019, datetime.now().year + 1))
-    else:
-        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    seasons = h.parse_seasons(seasons)
     
-    pbp = pd.DataFrame()
-    for season in seasons:
-        pbp = pd.concat([pbp, pd.read_csv(f"https://github.com/ryanndu/cebl-data/releases/download/pbp/cebl_pbp_{season}.csv")])
-    return pbp
\ No newline at end of file
+    h.validate_columns(columns)
+    _validate_memory_map(compact, memory_map)
+    urls = [_URLS["pbp"].format(season=season) for season in seasons]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(lambda url: store.read_asset(url, columns=columns, memory_map=memory_map), urls))
+    with instrument.stage("concat") as record:
+        pbp = pd.concat(frames) if frames else pd.DataFrame()
+        record["rows"] = len(pbp)
+    if compact:
+        pbp = h.compact_dtypes(pbp)
+    return pbp
+
+
+def load_cebl_all(seasons=None, datasets=None, compact=False, max_workers=8, memory_map=False):
+    """
+    Load several cleaned CEBL datasets at once from the cebl data repository.
+
+    Seasons are validated once and every download (one per dataset, one per
+    season for pbp) runs concurrently, so the total time is close to that
+    of the slowest download.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+        - int : Single season year (e.g., 2020)
+        - list of int : Multiple seasons (e.g., [2019, 2020, 2021])
+        - None : Load all available seasons
+
+        All years must be 2019 or later.
+    datasets : list of str, optional
+        Datasets to load, among "schedule", "team_boxscore",
+        "player_boxscore", "officials", "coaches" and "pbp". By default,
+        all datasets are loaded.
+    compact : bool, default False
+        If True, use memory-efficient dtypes: categoricals for repeated
+        strings, nullable small integers and parsed datetimes.
+    max_workers : int, default 8
+        Maximum number of concurrent downloads.
+    memory_map : bool, default False
+        If True, return columns backed by memory-mapped Arrow files stored
+        in the cache directory, so processes loading the same data share a
+        single copy of it in memory. Columns have ``pandas.ArrowDtype``
+        dtypes. Requires the optional ``pyarrow`` dependency and cannot be
+        combined with ``compact``.
+
+    Returns
+    -------
+    dict of pandas.DataFrame
+        The requested datasets, keyed by name. See the ``load_cebl_*``
+        functions for the columns.
+
+    Examples
+    --------
+    >>> data = load_cebl_all(2024)
+    >>> data["schedule"]
+    >>> load_cebl_all([2023, 2024], datasets=["team_boxscore", "pbp"])
+    """
+    seasons = h.parse_seasons(seasons)
+    datasets = h.parse_datasets(datasets)
+    _validate_memory_map(compact, memory_map)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for dataset in datasets:
+            if dataset == "pbp":
+                futures[dataset] = [executor.submit(store.read_asset, _URLS["pbp"].format(season=season), memory_map=memory_map)
+                                    for season in seasons]
+            else:
+                futures[dataset] = [executor.submit(_read_release, _URLS[dataset], seasons, None, compact, memory_map)]
+        data = {}
+        for dataset, parts in futures.items():
+            frames = [future.result() for future in parts]
+            with instrument.stage("concat") as record:
+                data[dataset] = pd.concat(frames) if frames else pd.DataFrame()
+                record["rows"] = len(data[dataset])
+    if compact and "pbp" in data:
+        data["pbp"] = h.compact_dtypes(data["pbp"])
+    return data
+
+
+def refresh_cebl_data(frame, dataset, season=None, compact=False):
+    """
+    Update previously loaded CEBL data with the latest data of one season.
+
+    Only ``season`` is loaded again; rows of the other seasons in ``frame``
+    are kept as they are. Rows of ``season`` are matched on the key columns
+    of the dataset (``fiba_id`` for the schedule, ``game_id`` and
+    ``action_number`` for pbp, ``game_id`` and names for the others), and
+    only new or changed rows are merged into ``frame``. Frames of the
+    dataset containing ``season`` are removed from the in-memory cache, so
+    later loads are not older than the refreshed frame.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Data previously returned by the loader of ``dataset``. It must
+        contain the ``season`` column and the key columns of the dataset.
+    dataset : str
+        One of "schedule", "team_boxscore", "player_boxscore", "officials",
+        "coaches" or "pbp".
+    season : int, optional
+        Season to refresh. By default, the current season.
+    compact : bool, default False
+        Whether ``frame`` was loaded with ``compact=True``.
+
+    Returns
+    -------
+    tuple of pandas.DataFrame
+        ``(updated, delta)``: the updated frame, where changed rows replace
+        their previous version in place and new rows are appended, and the
+        new or changed rows alone. Both keep the dtypes of ``frame``,
+        categoricals gaining the new categories of the season.
+
+    Examples
+    --------
+    >>> pbp = load_cebl_pbp()
+    >>> pbp, delta = refresh_cebl_data(pbp, "pbp")
+    """
+    h.validate_dataset(dataset)
+    if season is None:
+        season = datetime.now().year
+    h.validate_seasons([season])
+    keys = h.DATASET_KEYS[dataset]
+    missing = [c for c in keys + ['season'] if c not in frame.columns]
+    if missing:
+        raise ValueError(f"frame is missing the columns {missing} needed to refresh {dataset}")
+
+    # bypass the in-memory cache, which may hold a stale copy of the season,
+    # and drop that copy
+    load = _LOADERS[dataset].__wrapped__
+    fresh = load(season, columns=list(frame.columns), compact=compact)
+    memo._invalidate(load.__name__, season)
+
+    in_season = (frame['season'] == season).to_numpy()
+    old = frame[in_season].set_index(keys)
+    new = fresh.set_index(keys)
+    old_rows = old[~old.index.duplicated(keep='last')]
+    new_rows = new[~new.index.duplicated(keep='last')]
+    common = new_rows.index.intersection(old_rows.index)
+    changed = np.zeros(len(common), dtype=bool)
+    for column in new_rows.columns:
+        changed |= ~_same_values(new_rows.loc[common, column], old_rows.loc[common, column])
+    delta_keys = new_rows.index.difference(old_rows.index).union(common[changed])
+
+    delta = fresh[new.index.isin(delta_keys)]
+    stale = in_season.copy()
+    stale[in_season] = old.index.isin(delta_keys)
+
+    # changed rows take the position of their previous version, new rows go last
+    replaced = pd.Series(np.flatnonzero(stale), index=old.index[old.index.isin(delta_keys)])
+    replaced = replaced[~replaced.index.duplicated(keep='first')]
+    positions = replaced.reindex(new.index[new.index.isin(delta_keys)]).to_numpy(dtype=float)
+    appended = np.isnan(positions)
+    positions = np.where(appended, len(frame) + np.cumsum(appended) - 1, positions)
+    order = np.argsort(np.r_[np.flatnonzero(~stale), positions], kind='stable')
+    kept, delta = _align_dtypes(frame[~stale], delta)
+    updated = pd.concat([kept, delta]).iloc[order]
+    return updated, delta
+
+
+def _same_values(a, b):
+    # null-safe: pd.NA of nullable and arrow columns compares as missing
+    a_na, b_na = a.isna().to_numpy(), b.isna().to_numpy()
+    a = np.where(a_na, None, a.to_numpy(dtype=object))
+    b = np.where(b_na, None, b.to_numpy(dtype=object))
+    return (a == b) | (a_na & b_na)
+
+
+def _align_dtypes(frame, delta):
+    """
+    Cast the columns of ``delta`` to the dtypes of ``frame``, so they can be
+    concatenated without losing compact or arrow dtypes.
+
+    The fresh season is compacted on its own, so categoricals get the union
+    of both categories. Other extension dtypes are cast when the values fit
+    them, and NumPy dtypes are left to the common type found by concat.
+    """
+    delta = delta.copy()
+    for column, dtype in frame.dtypes.items():
+        if column not in delta.columns or delta[column].dtype == dtype:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = delta[column].dropna().unique()
+            categories = dtype.categories.append(pd.Index(values).difference(dtype.categories))
+            dtype = pd.CategoricalDtype(categories, ordered=dtype.ordered)
+            frame = frame.assign(**{column: frame[column].astype(dtype)})
+            delta[column] = delta[column].astype(dtype)
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            try:
+                delta[column] = delta[column].astype(dtype)
+            except (TypeError, ValueError, NotImplementedError):
+                # e.g. a fresh Int16 column beyond the range of the old Int8
+                pass
+    return frame, delta
+
+
+def load_cebl_game(game_id):
+    """
+    Load every dataset of a single CEBL game from the cebl data repository.
+
+    The rows of the game are located with a game index stored with the
+    cached data, so only the season partition and row range holding the
+    game are read from each dataset.
+
+    Each dataset is revalidated with the server as in every load (see
+    :func:`ceblpy.cache.fetch`). The datasets are looked up concurrently,
+    so a lookup waits on two rounds of conditional requests: the datasets,
+    then the pbp of the season of the game. For lookups in milliseconds
+    without any request, set ``max_age`` or offline mode with
+    :func:`ceblpy.cache.set_cache_options`.
+
+    Parameters
+    ----------
+    game_id : int
+        FIBA id of the game (``fiba_id`` in the schedule, ``game_id`` in the
+        other datasets).
+
+    Returns
+    -------
+    dict of pandas.DataFrame
+        The rows of the game in each dataset, keyed by "schedule",
+        "team_boxscore", "player_boxscore", "officials", "coaches" and
+        "pbp". See the ``load_cebl_*`` functions for the columns.
+
+    Examples
+    --------
+    >>> game = load_cebl_game(2400360)
+    >>> game["pbp"]
+    """
+    if isinstance(game_id, bool) or not isinstance(game_id, int):
+        raise TypeError(f"Expected game_id to be an int, got {type(game_id).__name__}")
+
+    datasets = ("schedule", "team_boxscore", "player_boxscore", "officials", "coaches")
+    # each lookup revalidates its asset, so the requests run concurrently and
+    # the pbp lookup starts as soon as the schedule gives the season
+    with ThreadPoolExecutor(max_workers=len(datasets) + 1) as executor:
+        futures = {dataset: executor.submit(store.read_game, _URLS[dataset], game_id, partitioned=True)
+                   for dataset in datasets}
+        schedule = futures["schedule"].result()
+        if schedule.empty:
+            raise ValueError(f"Game {game_id} not found in the CEBL schedule")
+        season = int(schedule['season'].iloc[0])
+        futures["pbp"] = executor.submit(store.read_game, _URLS["pbp"].format(season=season), game_id)
+        return {dataset: future.result() for dataset, future in futures.items()}
+
+
+def iter_cebl_pbp(seasons=None, by="game", chunksize=10000, columns=None):
+    """
+    Iterate over cleaned CEBL pbp data from the cebl data repository.
+
+    Unlike :func:`load_cebl_pbp`, seasons are streamed in chunks of at most
+    ``chunksize`` rows, so memory use stays bounded however many seasons
+    are requested.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+        - int : Single season year (e.g., 2020)
+        - list of int : Multiple seasons (e.g., [2019, 2020, 2021])
+        - None : Load all available seasons
+
+        All years must be 2019 or later.
+    by : {"game", None}, default "game"
+        If "game", yield one DataFrame per game. If None, yield DataFrames
+        of ``chunksize`` rows.
+    chunksize : int, default 10000
+        Number of rows read at a time.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+
+    Yields
+    ------
+    pandas.DataFrame
+        The pbp of one game, or a chunk of ``chunksize`` rows, with the
+        columns described in :func:`load_cebl_pbp`.
+
+    Examples
+    --------
+    >>> for game in iter_cebl_pbp(2024):
+    ...     print(game['game_id'].iloc[0], len(game))
+    >>> for chunk in iter_cebl_pbp([2023, 2024], by=None, chunksize=50000):
+    ...     print(len(chunk))
+    """
+    seasons = h.parse_seasons(seasons)
+    h.validate_columns(columns)
+
+    def chunks():
+        for season in seasons:
+            yield from store.iter_asset(_URLS["pbp"].format(season=season), chunksize, columns=_with_game_id(columns, by))
+
+    return _iter_by(chunks(), by, columns)
+
+
+def iter_cebl_player_boxscore(seasons=None, by="game", chunksize=10000, columns=None):
+    """
+    Iterate over cleaned CEBL player boxscore data from the cebl data repository.
+
+    Unlike :func:`load_cebl_player_boxscore`, rows are streamed in chunks of
+    at most ``chunksize`` rows, so memory use stays bounded however many
+    seasons are requested.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to load. By default, None loads all available seasons.
+        - int : Single season year (e.g., 2020)
+        - list of int : Multiple seasons (e.g., [2019, 2020, 2021])
+        - None : Load all available seasons
+
+        All years must be 2019 or later.
+    by : {"game", None}, default "game"
+        If "game", yield one DataFrame per game. If None, yield DataFrames
+        of at most ``chunksize`` rows.
+    chunksize : int, default 10000
+        Number of rows read at a time.
+    columns : list of str, optional
+        Columns to load. By default, all columns are loaded.
+
+    Yields
+    ------
+    pandas.DataFrame
+        The player boxscores of one game, or a chunk of rows, with the
+        columns described in :func:`load_cebl_player_boxscore`.
+
+    Examples
+    --------
+    >>> for game in iter_cebl_player_boxscore(2024):
+    ...     print(game['game_id'].iloc[0], len(game))
+    """
+    seasons = h.parse_seasons(seasons)
+    h.validate_columns(columns)
+
+    chunks = store.iter_seasons(_URLS["player_boxscore"], seasons, chunksize, columns=_with_game_id(columns, by))
+    return _iter_by(chunks, by, columns)
+
+
+def _with_game_id(columns, by):
+    if by == "game" and columns is not None and "game_id" not in columns:
+        return columns + ["game_id"]
+    return columns
+
+
+def _iter_by(chunks, by, columns=None):
+    if by not in ("game", None):
+        raise ValueError(f"Expected by to be 'game' or None, got {by!r}")
+    if by is None:
+        return chunks
+    return _iter_games(chunks, columns)
+
+
+def _iter_games(chunks, columns=None):
+    """
+    Regroup chunks into one frame per game. Rows of a game must be contiguous.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        if not len(chunk):
+            continue
+        # the last game of a chunk may continue in the next one
+        last = chunk['game_id'].iloc[-1]
+        complete = chunk['game_id'] != last
+        for _, game in chunk[complete].groupby('game_id', sort=False):
+            yield game[columns] if columns is not None else game
+        carry = chunk[~complete]
+    if carry is not None and len(carry):
+        yield carry[columns] if columns is not None else carry
+
+
+def _read_release(url, seasons, columns=None, compact=False, memory_map=False):
+    """
+    Read a single-file release and keep the rows of the given seasons.
+    """
+    h.validate_columns(columns)
+    _validate_memory_map(compact, memory_map)
+    df = store.read_seasons(url, seasons, columns=columns, memory_map=memory_map)
+    if compact:
+        df = h.compact_dtypes(df)
+    return df
+
+
+def _validate_memory_map(compact, memory_map):
+    if compact and memory_map:
+        raise ValueError("compact and memory_map cannot be combined, compact dtypes are private copies of the data")
+
+
+_LOADERS = {
+    "schedule": load_cebl_schedule,
+    "team_boxscore": load_cebl_team_boxscore,
+    "player_boxscore": load_cebl_player_boxscore,
+    "officials": load_cebl_officials,
+    "coaches": load_cebl_coaches,
+    "pbp": load_cebl_pbp,
+}
@@ -0,0 +1,157 @@
+"""
+Command-line interface of ceblpy.
+
+``ceblpy sync`` downloads every release asset into the on-disk cache, so
+later loads can run offline. Run ``ceblpy sync --help`` for the options.
+"""
+import argparse
+import sys
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import cache
+from . import helpers as h
+
+
+def sync(seasons=None, datasets=None, max_workers=8, convert=True, progress=None):
+    """
+    Download every release asset into the on-disk cache.
+
+    Assets are downloaded in parallel. Cached assets are first checked
+    against the size and checksum recorded when they were downloaded, then
+    revalidated with the server, so unchanged assets are not downloaded
+    again. Interrupted downloads are resumed. Offline mode and the
+    ``max_age`` cache option are ignored by the sync, without changing
+    them for the loads running at the same time. Requires the on-disk
+    cache to be enabled.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Seasons of the pbp files to download. By default, None downloads all
+        available seasons. The other datasets are single files holding every
+        season.
+    datasets : list of str, optional
+        Datasets to download. By default, all datasets are downloaded.
+    max_workers : int, default 8
+        Maximum number of concurrent downloads.
+    convert : bool, default True
+        If True, also build the Parquet copies read by the loaders, so the
+        first load does not have to parse the CSV files. Requires the
+        optional ``pyarrow`` dependency.
+    progress : callable, optional
+        Function called as each asset completes with its name, its status
+        ("downloaded", "unchanged", "missing" or "failed: <reason>") and its
+        size in bytes.
+
+    Returns
+    -------
+    dict
+        The status of each asset, keyed by URL.
+
+    Examples
+    --------
+    >>> sync(datasets=["schedule", "pbp"], seasons=2024)
+    """
+    seasons = h.parse_seasons(seasons)
+    datasets = h.parse_datasets(datasets)
+    if not cache.get_cache_options()["enabled"]:
+        raise ValueError("sync requires the on-disk cache to be enabled")
+    # imported here so that `ceblpy --help` does not import pandas
+    from .ceblpy import _URLS
+
+    assets = []
+    for dataset in datasets:
+        if dataset == "pbp":
+            assets.extend((dataset, _URLS["pbp"].format(season=season)) for season in seasons)
+        else:
+            assets.append((dataset, _URLS[dataset]))
+
+    statuses = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_sync_asset, dataset, url, convert): url for dataset, url in assets}
+        for future in as_completed(futures):
+            url = futures[future]
+            status, size = future.result()
+            statuses[url] = status
+            if progress is not None:
+                progress(_asset_name(url), status, size)
+    return {url: statuses[url] for _, url in assets}
+
+
+def main(argv=None):
+    """
+    Entry point of the ``ceblpy`` console script.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        Command-line arguments. By default, ``sys.argv[1:]``.
+
+    Returns
+    -------
+    int
+        The exit status: 0 on success, 1 if an asset could not be synced.
+    """
+    parser = argparse.ArgumentParser(prog="ceblpy", description=__doc__.strip().split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("sync", help="download every dataset into the local cache",
+                                  description=sync.__doc__.strip().split("\n\n")[0])
+    command.add_argument("--seasons", type=int, nargs="+", metavar="YEAR",
+                         help="seasons of the pbp files to download (default: all)")
+    command.add_argument("--datasets", nargs="+", choices=list(h.DATASET_KEYS), metavar="DATASET",
+                         help="datasets to download (default: all)")
+    command.add_argument("--workers", type=int, default=8, help="concurrent downloads (default 8)")
+    command.add_argument("--cache-dir", help="cache directory (default: CEBLPY_CACHE_DIR or ~/.cache/ceblpy)")
+    command.add_argument("--max-size", type=int, metavar="BYTES", help="maximum size of the cache")
+    command.add_argument("--no-convert", action="store_true", help="do not build the Parquet copies")
+    command.add_argument("-q", "--quiet", action="store_true", help="only report failures")
+    args = parser.parse_args(argv)
+
+    cache.set_cache_options(cache_dir=args.cache_dir, max_size=args.max_size)
+    seasons = h.parse_seasons(args.seasons)
+    datasets = h.parse_datasets(args.datasets)
+    total = len(datasets) - 1 + len(seasons) if "pbp" in datasets else len(datasets)
+    counts = {}
+
+    def report(name, status, size):
+        kind = status.split(":")[0]
+        counts[kind] = counts.get(kind, 0) + 1
+        if not args.quiet or kind == "failed":
+            done = sum(counts.values())
+            print(f"[{done:>{len(str(total))}}/{total}] {name:<36} {status} ({size / 1024 ** 2:.1f} MB)",
+                  file=sys.stderr, flush=True)
+
+    sync(seasons, datasets, max_workers=args.workers, convert=not args.no_convert, progress=report)
+    if not args.quiet:
+        print(", ".join(f"{n} {status}" for status, n in sorted(counts.items())), file=sys.stderr)
+    return 1 if counts.get("failed") else 0
+
+
+def _sync_asset(dataset, url, convert):
+    from . import store
+
+    try:
+        intact = cache.verify(url)
+        before = cache._read_meta(cache._asset_path(url)) if intact else None
+        path = cache.fetch(url, revalidate=True)
+        meta = cache._read_meta(cache._asset_path(url))
+        unchanged = before is not None and before.get("fetched_at") == meta.get("fetched_at")
+        if convert:
+            store.materialize(url, partitioned=dataset != "pbp", path=path)
+    except urllib.error.HTTPError as e:
+        # pbp files of upcoming seasons are not published yet
+        if e.code == 404:
+            return "missing", 0
+        return f"failed: {e}", 0
+    except Exception as e:
+        return f"failed: {e}", 0
+    return "unchanged" if unchanged else "downloaded", meta.get("size", 0)
+
+
+def _asset_name(url):
+    return "/".join(url.rstrip("/").split("/")[-2:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,18 @@
-import pandas as pd
 from datetime import datetime
 
+# numpy and pandas are imported by the functions using them, so that
+# validating seasons does not import them
+
+# columns identifying a row of each dataset
+DATASET_KEYS = {
+    "schedule": ["fiba_id"],
+    "team_boxscore": ["game_id", "team_name"],
+    "player_boxscore": ["game_id", "team_name", "player_name"],
+    "officials": ["game_id", "officials_type", "officials_name"],
+    "coaches": ["game_id", "team_name", "coach_name"],
+    "pbp": ["game_id", "action_number"],
+}
+
 def validate_seasons(seasons):
     """
     Checks whether all the provided seasons are valid years and raises an error if not.
@@ -26,4 +38,202 @@ def validate_seasons(seasons):
         if not isinstance(year, int):
             raise TypeError(f"Expected an integer for year, got {type(year).__name__}")
         if year < 2019 or year > datetime.now().year:
-            raise ValueError(f"Year {year} out of valid range (2019-{datetime.now().year})")
\ No newline at end of file
+            raise ValueError(f"Year {year} out of valid range (2019-{datetime.now().year})")
+
+def parse_seasons(seasons):
+    """
+    Converts the seasons argument of the loaders to a validated list of years.
+
+    Parameters
+    ----------
+    seasons: int, list of int, or None
+        A single season, a list of seasons, or None for all available seasons.
+
+    Returns
+    -------
+    list of int
+        The requested seasons.
+
+    Examples
+    --------
+    >>> parse_seasons(2020)
+    [2020]
+    >>> parse_seasons("2020")  # Raises TypeError
+    """
+    if isinstance(seasons, int):
+        seasons = [seasons]
+    if isinstance(seasons, list):
+        validate_seasons(seasons)
+    elif seasons is None:
+        seasons = list(range(2019, datetime.now().year + 1))
+    else:
+        raise TypeError(f"Expected seasons to be an int, list of ints, or None, got {type(seasons).__name__}")
+    return seasons
+
+
+def validate_columns(columns):
+    """
+    Checks whether the provided columns are a list of column names and raises an error if not.
+
+    Parameters
+    ----------
+    columns: list of str or None
+        Column names to validate. None selects all columns.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> validate_columns(["game_id", "season"])
+    >>> validate_columns("game_id")  # Raises TypeError
+    """
+    if columns is None:
+        return
+    if not isinstance(columns, list):
+        raise TypeError(f"Expected columns to be a list of str or None, got {type(columns).__name__}")
+    for column in columns:
+        if not isinstance(column, str):
+            raise TypeError(f"Expected a str for column, got {type(column).__name__}")
+
+
+def validate_dataset(dataset):
+    """
+    Checks whether the provided dataset name is valid and raises an error if not.
+
+    Parameters
+    ----------
+    dataset: str
+        One of "schedule", "team_boxscore", "player_boxscore", "officials",
+        "coaches" or "pbp".
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> validate_dataset("pbp")
+    >>> validate_dataset("players")  # Raises ValueError
+    """
+    if not isinstance(dataset, str):
+        raise TypeError(f"Expected a str for dataset, got {type(dataset).__name__}")
+    if dataset not in DATASET_KEYS:
+        raise ValueError(f"Unknown dataset {dataset!r}, expected one of {', '.join(DATASET_KEYS)}")
+
+
+def parse_datasets(datasets):
+    """
+    Converts the datasets argument of the bulk loaders to a validated list of names.
+
+    Parameters
+    ----------
+    datasets: list of str or None
+        Dataset names, or None for all datasets.
+
+    Returns
+    -------
+    list of str
+        The requested datasets.
+
+    Examples
+    --------
+    >>> parse_datasets(["schedule", "pbp"])
+    ['schedule', 'pbp']
+    >>> parse_datasets("pbp")  # Raises TypeError
+    """
+    if datasets is None:
+        return list(DATASET_KEYS)
+    if not isinstance(datasets, list):
+        raise TypeError(f"Expected datasets to be a list of str or None, got {type(datasets).__name__}")
+    for dataset in datasets:
+        validate_dataset(dataset)
+    return datasets
+
+
+def clock_seconds(clock):
+    """
+    Converts "MM:SS" clock strings, such as game times or minutes played, to seconds.
+
+    Each distinct value is parsed once, so long columns with few distinct
+    clock values convert quickly.
+
+    Parameters
+    ----------
+    clock : pandas.Series
+        Clock strings. Missing or malformed values become NaN.
+
+    Returns
+    -------
+    numpy.ndarray
+        The number of seconds of each clock value.
+
+    Examples
+    --------
+    >>> clock_seconds(pd.Series(["09:47", "240:00"]))
+    array([  587., 14400.])
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, values = pd.factorize(clock.astype("string"))
+    parts = pd.Series(values, dtype="string").str.split(":", n=1, expand=True)
+    if parts.shape[1] < 2:
+        return np.full(len(clock), np.nan)
+    seconds = (pd.to_numeric(parts[0], errors="coerce") * 60 + pd.to_numeric(parts[1], errors="coerce"))
+    seconds = seconds.to_numpy(dtype=float, na_value=np.nan)
+    return np.where(codes >= 0, seconds[codes], np.nan)
+
+
+def compact_dtypes(df):
+    """
+    Convert the columns of a DataFrame to memory-efficient dtypes.
+
+    Repeated strings (team and player names, action types, qualifiers, ...)
+    become categoricals, whole-number columns become the smallest nullable
+    integer type that fits them, and ``start_time_utc`` is parsed as a
+    datetime.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        A DataFrame returned by one of the ``load_cebl_*`` functions.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A copy of ``df`` with compact dtypes.
+
+    Examples
+    --------
+    >>> compact_dtypes(load_cebl_pbp(2024))
+    """
+    import pandas as pd
+
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column == "start_time_utc":
+            df[column] = pd.to_datetime(series, utc=True)
+        elif pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        elif pd.api.types.is_numeric_dtype(series):
+            df[column] = _compact_numeric(series)
+        elif series.nunique() <= len(series) // 2:
+            df[column] = series.astype("category")
+    return df
+
+
+def _compact_numeric(series):
+    import numpy as np
+
+    values = series.dropna()
+    if len(values) and not (values == values.round()).all():
+        return series
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in ("Int8", "Int16", "Int32", "Int64"):
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return series.astype(dtype)
+    return series
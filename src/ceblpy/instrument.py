@@ -0,0 +1,123 @@
+import contextlib
+import threading
+import time
+import warnings
+
+_hooks = []
+_totals = {}
+_lock = threading.Lock()
+
+
+def add_hook(callback):
+    """
+    Register a callback called at the end of every stage of a load.
+
+    Loads are split into "download", "decompress", "parse", "filter" and
+    "concat" stages. The callback receives a dict with the ``stage`` name,
+    its duration in ``seconds``, the number of ``bytes`` downloaded or read,
+    the number of ``rows`` produced and the ``url`` of the asset, if any.
+
+    Parameters
+    ----------
+    callback : callable
+        Function taking the stage record as its only argument.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> add_hook(lambda record: print(record["stage"], record["seconds"]))
+    """
+    if not callable(callback):
+        raise TypeError(f"Expected a callable, got {type(callback).__name__}")
+    with _lock:
+        _hooks.append(callback)
+
+
+def remove_hook(callback):
+    """
+    Unregister a callback registered with :func:`add_hook`.
+
+    Parameters
+    ----------
+    callback : callable
+        The callback to remove.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> remove_hook(callback)
+    """
+    with _lock:
+        _hooks.remove(callback)
+
+
+def stats():
+    """
+    Summarize the stages of every load since the start or the last reset.
+
+    Returns
+    -------
+    dict
+        For each stage, the number of ``calls``, the total ``seconds``,
+        ``bytes`` and ``rows``.
+
+    Examples
+    --------
+    >>> stats()["download"]["bytes"]
+    """
+    with _lock:
+        return {name: dict(total) for name, total in _totals.items()}
+
+
+def reset_stats():
+    """
+    Reset the summary returned by :func:`stats`.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> reset_stats()
+    """
+    with _lock:
+        _totals.clear()
+
+
+@contextlib.contextmanager
+def stage(name, url=None):
+    """
+    Time a stage of a load. The yielded record can be updated with the
+    ``bytes`` and ``rows`` of the stage.
+    """
+    record = {"stage": name, "url": url, "bytes": 0, "rows": 0}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _record(record)
+
+
+def _record(record):
+    with _lock:
+        total = _totals.setdefault(record["stage"], {"calls": 0, "seconds": 0.0, "bytes": 0, "rows": 0})
+        total["calls"] += 1
+        total["seconds"] += record["seconds"]
+        total["bytes"] += record["bytes"]
+        total["rows"] += record["rows"]
+        hooks = list(_hooks) if _hooks else None
+    if hooks is None:
+        return
+    for hook in hooks:
+        try:
+            hook(record)
+        except Exception as e:
+            warnings.warn(f"ceblpy stage hook {hook!r} failed: {e!r}")
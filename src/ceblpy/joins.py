@@ -0,0 +1,201 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import ceblpy
+from . import memo
+
+# schedule columns added to the pbp, the first two identify the teams of a game
+_GAME_COLUMNS = ["home_team_id", "away_team_id", "home_team_name", "away_team_name", "venue_name", "start_time_utc"]
+_PLAYER_COLUMNS = ["player_position", "starter"]
+
+# seasons -> {"games": game index, "players": player index, "expires": deadline or None}
+_indexes = {}
+_lock = threading.Lock()
+
+
+def enrich_pbp(pbp, schedule=None, player_boxscore=None):
+    """
+    Add game and player context to play-by-play data.
+
+    Rather than merging on object keys, each pbp row is located with binary
+    searches in sorted integer indexes: the games of the schedule are
+    sorted by ``fiba_id``, and the players of the boxscores by game, side
+    (home or away) and categorical-coded ``player_name``. When the schedule
+    and boxscores are loaded by this function, the indexes are built once
+    per set of seasons and cached. Indexes including the current season
+    expire after the TTL of the in-memory cache (see
+    :func:`ceblpy.memo.set_memory_cache_options`), so new games are picked up.
+
+    Parameters
+    ----------
+    pbp : pandas.DataFrame
+        Play-by-play data, as returned by :func:`ceblpy.ceblpy.load_cebl_pbp`.
+        Must contain the ``game_id``, ``season``, ``team_id`` and
+        ``player_name`` columns.
+    schedule : pandas.DataFrame, optional
+        Schedule of the pbp games. By default, the schedule of the pbp
+        seasons is loaded.
+    player_boxscore : pandas.DataFrame, optional
+        Player boxscores of the pbp games. By default, the boxscores of the
+        pbp seasons are loaded.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A copy of ``pbp`` with the following columns added. Rows whose game
+        or player is not found have missing values.
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        home_team_id                       Int64
+        away_team_id                       Int64
+        home_team_name                     category
+        away_team_name                     category
+        venue_name                         category
+        start_time_utc                     datetime
+        team_name                          category
+        is_home                            boolean
+        player_position                    category
+        starter                            boolean
+        ================================  ===========
+
+    Examples
+    --------
+    >>> enrich_pbp(load_cebl_pbp(2024))
+    """
+    missing = [c for c in ("game_id", "season", "team_id", "player_name") if c not in pbp.columns]
+    if missing:
+        raise ValueError(f"pbp is missing the columns {missing} needed to enrich it")
+    seasons = sorted(int(s) for s in pd.unique(pbp["season"].dropna()))
+    games, players = _indexes_of(seasons, schedule, player_boxscore)
+
+    df = pbp.copy()
+    game = _lookup(games["keys"], pbp["game_id"].to_numpy(dtype=np.int64, na_value=-1))
+    for column in _GAME_COLUMNS:
+        df[column] = _take(games["columns"][column], game)
+
+    # compare ids and combine team names on integer codes, not objects
+    team_id = pbp["team_id"].to_numpy(dtype=float, na_value=np.nan)
+    is_home = (game >= 0) & (team_id == games["home_ids"][game])
+    is_away = (game >= 0) & (team_id == games["away_ids"][game])
+    home = df["home_team_name"].cat.codes.to_numpy()
+    away = df["away_team_name"].cat.codes.to_numpy()
+    teams = np.where(is_home, home, np.where(is_away, away, -1))
+    df["team_name"] = pd.Categorical.from_codes(teams, dtype=df["home_team_name"].dtype)
+    side = pd.array(is_home, dtype="boolean")
+    side[~(is_home | is_away)] = pd.NA
+    df["is_home"] = side
+
+    # factorize the pbp names, then match the distinct names only
+    codes, uniques = pd.factorize(pbp["player_name"])
+    names = np.append(pd.Index(players["names"]).get_indexer(uniques), -1)[codes]
+    known = (is_home | is_away) & (names >= 0)
+    keys = np.where(known, _player_key(game, is_home, names), -1)
+    player = _lookup(players["keys"], keys)
+    for column in _PLAYER_COLUMNS:
+        df[column] = _take(players["columns"][column], player)
+    return df
+
+
+def clear_join_indexes():
+    """
+    Remove every cached join index.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> clear_join_indexes()
+    """
+    with _lock:
+        _indexes.clear()
+
+
+def _indexes_of(seasons, schedule, player_boxscore):
+    # indexes of frames passed by the caller are not cached
+    if schedule is not None or player_boxscore is not None:
+        return _build_indexes(seasons, schedule, player_boxscore)
+    key = tuple(seasons)
+    with _lock:
+        entry = _indexes.get(key)
+    if entry is not None and not memo._expired(entry["expires"]):
+        return entry["games"], entry["players"]
+    # indexes of the current season expire like the loaded frames
+    expires = memo._expires(seasons)
+    games, players = _build_indexes(seasons, schedule, player_boxscore)
+    with _lock:
+        _indexes[key] = {"games": games, "players": players, "expires": expires}
+    return games, players
+
+
+def _build_indexes(seasons, schedule, player_boxscore):
+    if schedule is None:
+        schedule = ceblpy._LOADERS["schedule"](seasons)
+    if player_boxscore is None:
+        player_boxscore = ceblpy._LOADERS["player_boxscore"](seasons)
+    games = _game_index(schedule)
+    # player indexes refer to the positions of the games in the game index
+    return games, _player_index(player_boxscore, games)
+
+
+def _game_index(schedule):
+    ids = schedule["fiba_id"].to_numpy(dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    # home and away names share categories, so their codes can be combined
+    teams = pd.unique(pd.concat([schedule["home_team_name"], schedule["away_team_name"]]).dropna())
+    columns = {}
+    for column in _GAME_COLUMNS:
+        values = schedule[column].iloc[order]
+        if column.endswith("_id"):
+            columns[column] = pd.array(values, dtype="Int64")
+        elif column == "start_time_utc":
+            columns[column] = pd.to_datetime(values, utc=True).array
+        elif column.endswith("_team_name"):
+            columns[column] = pd.Categorical(values, categories=teams)
+        else:
+            columns[column] = pd.Categorical(values)
+    return {
+        "keys": ids[order],
+        "columns": columns,
+        "home_ids": columns["home_team_id"].to_numpy(dtype=float, na_value=np.nan),
+        "away_ids": columns["away_team_id"].to_numpy(dtype=float, na_value=np.nan),
+    }
+
+
+def _player_index(player_boxscore, games):
+    game = _lookup(games["keys"], player_boxscore["game_id"].to_numpy(dtype=np.int64))
+    home_names = np.asarray(_take(games["columns"]["home_team_name"], game), dtype=object)
+    is_home = player_boxscore["team_name"].to_numpy(dtype=object) == home_names
+    names = pd.Categorical(player_boxscore["player_name"])
+    keys = np.where(game >= 0, _player_key(game, is_home, names.codes), -1)
+    order = np.argsort(keys, kind="stable")
+    columns = {
+        "player_position": pd.Categorical(player_boxscore["player_position"].iloc[order]),
+        "starter": pd.array(player_boxscore["starter"].iloc[order], dtype="boolean"),
+    }
+    return {"keys": keys[order], "names": names.categories, "columns": columns}
+
+
+def _player_key(game, is_home, names):
+    # one int64 per game, side and player name code
+    return ((game.astype(np.int64) * 2 + is_home) << 32) | names.astype(np.int64)
+
+
+def _lookup(keys, values):
+    """
+    Return the position of each value in the sorted keys, or -1.
+    """
+    if not len(keys):
+        return np.full(len(values), -1)
+    positions = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    return np.where((keys[positions] == values) & (values >= 0), positions, -1)
+
+
+def _take(values, positions):
+    # missing positions (-1) become missing values
+    return values.take(positions, allow_fill=True)
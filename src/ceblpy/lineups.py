@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+from . import helpers as h
+
+# FIBA periods: four 10 minute quarters, then 5 minute overtimes
+_QUARTER_SECONDS = 600
+_OVERTIME_SECONDS = 300
+
+
+def lineup_stints(pbp):
+    """
+    Reconstruct the five-man lineup stints of each team from play-by-play data.
+
+    A stint is a stretch of a period during which neither team substitutes.
+    Players on court at the start of a period are those whose first
+    substitution in the period takes them out, or who have events in the
+    period without being substituted. Substitutions made at the same time
+    are applied together. Home and away teams are told apart by the score
+    that rises when they score, so games in which no team has scored yet
+    have no stints. Everything is computed with vectorized pandas and
+    NumPy operations, so the whole league history takes seconds.
+
+    Parameters
+    ----------
+    pbp : pandas.DataFrame
+        Play-by-play data as returned by :func:`ceblpy.ceblpy.load_cebl_pbp`,
+        with at least the ``game_id``, ``action_number``, ``period``,
+        ``game_time``, ``team_id``, ``player_id``, ``action_type``,
+        ``sub_type``, ``home_score`` and ``away_score`` columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per stint and team with the following columns:
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        game_id                            int
+        period                             int
+        stint                              int
+        team_id                            int
+        opponent_id                        int
+        players                            tuple
+        opponent_players                   tuple
+        start_time                         float
+        end_time                           float
+        seconds                            float
+        points_for                         int
+        points_against                     int
+        possessions                        float
+        opponent_possessions               float
+        ================================  ===========
+
+        ``start_time`` and ``end_time`` are seconds elapsed since the start
+        of the game, and ``players`` are sorted player ids. Possessions are
+        estimated as field goal attempts + 0.44 * free throw attempts -
+        offensive rebounds + turnovers.
+
+    Examples
+    --------
+    >>> stints = lineup_stints(load_cebl_pbp(2024))
+    >>> stints.groupby("players")[["seconds", "points_for", "points_against"]].sum()
+    """
+    required = ["game_id", "action_number", "period", "game_time", "team_id", "player_id",
+                "action_type", "sub_type", "home_score", "away_score"]
+    missing = [c for c in required if c not in pbp.columns]
+    if missing:
+        raise ValueError(f"pbp is missing the columns {missing}")
+
+    df = pbp[required].sort_values(["game_id", "period", "action_number"], kind="stable").reset_index(drop=True)
+    df["elapsed"] = _elapsed_seconds(df["period"], df["game_time"])
+    game = df["game_id"].to_numpy()
+    period = df["period"].to_numpy()
+    new_period = np.r_[True, (game[1:] != game[:-1]) | (period[1:] != period[:-1])]
+    period_id = np.cumsum(new_period) - 1
+
+    home, away = _home_away_teams(df)
+    df["home_team_id"] = df["game_id"].map(home)
+    df["away_team_id"] = df["game_id"].map(away)
+
+    # one bit per player of each team in each game
+    has_player = df["player_id"].notna() & df["team_id"].notna()
+    players = df.loc[has_player, ["game_id", "team_id", "player_id"]]
+    code = players.groupby(["game_id", "team_id"])["player_id"].rank(method="dense").astype(np.int64) - 1
+    if len(code) and code.max() > 62:
+        raise ValueError("More than 63 players for a team in a game")
+    bit = pd.Series(np.int64(0), index=df.index)
+    bit[has_player] = np.left_shift(np.int64(1), code.to_numpy())
+
+    is_sub = (df["action_type"] == "substitution").to_numpy() & has_player.to_numpy()
+    sub_out = is_sub & (df["sub_type"] == "out").to_numpy()
+
+    starters = _period_starters(df, has_player, is_sub, sub_out, period_id, bit)
+    delta = _substitution_deltas(df, is_sub, sub_out, period_id, bit)
+    lineups = {}
+    for side in ("home", "away"):
+        on_side = (df["team_id"] == df[f"{side}_team_id"]).to_numpy()
+        side_delta = pd.Series(np.where(on_side, delta, 0))
+        start = pd.Series(period_id).map(starters[side]).fillna(0).astype(np.int64)
+        lineups[side] = start.to_numpy() + side_delta.groupby(period_id).cumsum().to_numpy()
+
+    # apply substitutions made at the same time together
+    run = np.cumsum(np.r_[True, (is_sub[1:] != is_sub[:-1]) | new_period[1:]])
+    for side in ("home", "away"):
+        last = pd.Series(lineups[side]).groupby(run).transform("last").to_numpy()
+        lineups[side] = np.where(is_sub, last, lineups[side])
+
+    changed = new_period | np.r_[True, (lineups["home"][1:] != lineups["home"][:-1])
+                                 | (lineups["away"][1:] != lineups["away"][:-1])]
+    stint = np.cumsum(changed) - 1
+
+    # points and possessions of each row
+    home_points = df.groupby("game_id")["home_score"].diff().fillna(df["home_score"]).clip(lower=0).to_numpy()
+    away_points = df.groupby("game_id")["away_score"].diff().fillna(df["away_score"]).clip(lower=0).to_numpy()
+    action = df["action_type"].to_numpy()
+    possessions = (np.isin(action, ["2pt", "3pt"]) + 0.44 * (action == "freethrow")
+                   - ((action == "rebound") & (df["sub_type"] == "offensive").to_numpy())
+                   + (action == "turnover"))
+    is_home = (df["team_id"] == df["home_team_id"]).to_numpy()
+    is_away = (df["team_id"] == df["away_team_id"]).to_numpy()
+
+    rows = pd.DataFrame({
+        "stint": stint,
+        "game_id": game,
+        "period": period,
+        "period_id": period_id,
+        "elapsed": df["elapsed"].to_numpy(),
+        "home_team_id": df["home_team_id"].to_numpy(),
+        "away_team_id": df["away_team_id"].to_numpy(),
+        "home_lineup": lineups["home"],
+        "away_lineup": lineups["away"],
+        "home_points": home_points,
+        "away_points": away_points,
+        "home_possessions": np.where(is_home, possessions, 0.0),
+        "away_possessions": np.where(is_away, possessions, 0.0),
+    })
+    stints = rows.groupby("stint").agg(
+        game_id=("game_id", "first"),
+        period=("period", "first"),
+        period_id=("period_id", "first"),
+        start_time=("elapsed", "first"),
+        home_team_id=("home_team_id", "first"),
+        away_team_id=("away_team_id", "first"),
+        home_lineup=("home_lineup", "first"),
+        away_lineup=("away_lineup", "first"),
+        home_points=("home_points", "sum"),
+        away_points=("away_points", "sum"),
+        home_possessions=("home_possessions", "sum"),
+        away_possessions=("away_possessions", "sum"),
+    )
+    # the first stint of a period starts with the period, not its first event
+    first_in_period = stints["period_id"].ne(stints["period_id"].shift()).to_numpy()
+    stints["start_time"] = np.where(first_in_period, _period_offset(stints["period"]), stints["start_time"]).astype(float)
+    period_end = _period_offset(stints["period"]) + _period_length(stints["period"])
+    next_start = stints.groupby("period_id")["start_time"].shift(-1)
+    stints["end_time"] = next_start.fillna(pd.Series(period_end, index=stints.index))
+
+    roster = _roster(players, code)
+    return _by_team(stints, roster)
+
+
+def _elapsed_seconds(period, game_time):
+    return _period_offset(period) + _period_length(period) - h.clock_seconds(game_time)
+
+
+def _period_length(period):
+    period = np.asarray(period)
+    return np.where(period <= 4, _QUARTER_SECONDS, _OVERTIME_SECONDS)
+
+
+def _period_offset(period):
+    period = np.asarray(period)
+    return np.where(period <= 4, (period - 1) * _QUARTER_SECONDS,
+                    4 * _QUARTER_SECONDS + (period - 5) * _OVERTIME_SECONDS)
+
+
+def _home_away_teams(df):
+    """
+    Return the home and away team of each game, missing when undetermined.
+
+    The team scoring when the home score goes up is the home team, the team
+    scoring when the away score goes up the away team, and the other team
+    of a game is on the other side. Sides are undetermined until a team
+    scores.
+    """
+    has_team = df["team_id"].notna()
+    votes = pd.Series(np.int64(0), index=df.index)
+    for column, sign in (("home_score", 1), ("away_score", -1)):
+        rose = df.groupby("game_id")[column].diff().fillna(df[column]) > 0
+        votes += sign * rose.astype(np.int64)
+    teams = df.loc[has_team, ["game_id", "team_id"]].assign(vote=votes[has_team])
+    teams = teams.groupby(["game_id", "team_id"], sort=False)["vote"].sum().reset_index()
+    teams["vote"] -= teams.groupby("game_id")["vote"].transform("sum") - teams["vote"]
+    teams = teams.sort_values(["game_id", "vote"], kind="stable")
+    home = teams[teams["vote"] > 0].drop_duplicates("game_id", keep="last").set_index("game_id")["team_id"]
+    away = teams[teams["vote"] < 0].drop_duplicates("game_id", keep="first").set_index("game_id")["team_id"]
+    return home, away
+
+
+def _period_starters(df, has_player, is_sub, sub_out, period_id, bit):
+    """
+    Return the lineup bitmask of each side at the start of each period.
+    """
+    events = pd.DataFrame({
+        "period_id": period_id,
+        "team_id": df["team_id"].to_numpy(),
+        "player_id": df["player_id"].to_numpy(),
+        "bit": bit.to_numpy(),
+        "is_sub": is_sub,
+        "sub_out": sub_out,
+        "home": (df["team_id"] == df["home_team_id"]).to_numpy(),
+        "away": (df["team_id"] == df["away_team_id"]).to_numpy(),
+    })[has_player.to_numpy()]
+    subs = events[events["is_sub"]]
+    first_sub_out = subs.groupby(["period_id", "player_id", "team_id"])["sub_out"].first()
+    players = events.groupby(["period_id", "player_id", "team_id"]).agg(
+        bit=("bit", "first"), home=("home", "first"), away=("away", "first"))
+    starter = first_sub_out.reindex(players.index)
+    # players without substitutions in the period played all of it
+    players = players[starter.fillna(True).astype(bool)]
+    starters = {}
+    for side in ("home", "away"):
+        starters[side] = players[players[side]].groupby(level="period_id")["bit"].sum()
+    return starters
+
+
+def _substitution_deltas(df, is_sub, sub_out, period_id, bit):
+    """
+    Return the change of lineup bitmask made by each substitution.
+
+    A player is on court after a substitution in and off court after a
+    substitution out, whatever their previous state, so that repeated or
+    missing substitutions in the data cannot corrupt the bitmasks.
+    """
+    subs = pd.DataFrame({
+        "period_id": period_id[is_sub],
+        "team_id": df["team_id"].to_numpy()[is_sub],
+        "player_id": df["player_id"].to_numpy()[is_sub],
+        "on": ~sub_out[is_sub],
+    })
+    # before their first substitution, players going out were on court
+    previous = subs.groupby(["period_id", "team_id", "player_id"])["on"].shift(1)
+    previous = previous.fillna(~subs["on"]).astype(bool)
+    change = subs["on"].astype(np.int64) - previous.astype(np.int64)
+    delta = np.zeros(len(df), dtype=np.int64)
+    delta[is_sub] = change.to_numpy() * bit.to_numpy()[is_sub]
+    return delta
+
+
+def _roster(players, code):
+    roster = players.assign(code=code).drop_duplicates(["game_id", "team_id", "code"])
+    return dict(zip(zip(roster["game_id"], roster["team_id"], roster["code"]), roster["player_id"]))
+
+
+def _decode(mask, game_id, team_id, roster):
+    ids = []
+    bit = 0
+    while mask >> bit:
+        if (mask >> bit) & 1:
+            ids.append(roster[(game_id, team_id, bit)])
+        bit += 1
+    return tuple(sorted(ids))
+
+
+def _by_team(stints, roster):
+    stints = stints.reset_index()
+    stints["stint"] = stints.groupby("game_id").cumcount()
+    stints["seconds"] = stints["end_time"] - stints["start_time"]
+
+    # decode each distinct lineup once rather than every stint
+    decoded = {}
+    for side in ("home", "away"):
+        keys = stints[["game_id", f"{side}_team_id", f"{side}_lineup"]].drop_duplicates()
+        for game_id, team_id, mask in keys.itertuples(index=False):
+            decoded[(game_id, team_id, mask)] = _decode(int(mask), game_id, team_id, roster)
+        # undetermined teams (NaN ids) never match their decoded key
+        stints[f"{side}_players"] = [() if pd.isna(k[1]) else decoded[k]
+                                     for k in zip(stints["game_id"], stints[f"{side}_team_id"], stints[f"{side}_lineup"])]
+
+    columns = ["game_id", "period", "stint", "start_time", "end_time", "seconds"]
+    frames = []
+    for side, other in (("home", "away"), ("away", "home")):
+        frame = stints[columns].copy()
+        frame["team_id"] = stints[f"{side}_team_id"]
+        frame["opponent_id"] = stints[f"{other}_team_id"]
+        frame["players"] = stints[f"{side}_players"]
+        frame["opponent_players"] = stints[f"{other}_players"]
+        frame["points_for"] = stints[f"{side}_points"].astype(np.int64)
+        frame["points_against"] = stints[f"{other}_points"].astype(np.int64)
+        frame["possessions"] = stints[f"{side}_possessions"]
+        frame["opponent_possessions"] = stints[f"{other}_possessions"]
+        frames.append(frame)
+    result = pd.concat(frames).sort_values(["game_id", "stint", "team_id"], kind="stable")
+    # teams whose side is undetermined have no lineups
+    result = result[result["team_id"].notna()]
+    order = ["game_id", "period", "stint", "team_id", "opponent_id", "players", "opponent_players",
+             "start_time", "end_time", "seconds", "points_for", "points_against",
+             "possessions", "opponent_possessions"]
+    return result[order].reset_index(drop=True)
@@ -0,0 +1,203 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+_options = {
+    "max_bytes": int(os.environ.get("CEBLPY_MEMORY_CACHE_BYTES", 512 * 1024 ** 2)),
+    "ttl": float(os.environ.get("CEBLPY_MEMORY_CACHE_TTL", 300)),
+}
+# key -> (frame, size in bytes, expiry time or None)
+_entries = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+
+# arguments that change how a frame is loaded but not its contents
+_IGNORED_ARGUMENTS = ("max_workers",)
+
+
+def set_memory_cache_options(max_bytes=None, ttl=None):
+    """
+    Configure the in-memory cache shared by the ``load_cebl_*`` functions.
+
+    Options left as None keep their current value. Defaults can also be set
+    with the ``CEBLPY_MEMORY_CACHE_BYTES`` and ``CEBLPY_MEMORY_CACHE_TTL``
+    environment variables.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Memory budget in bytes. The least recently used frames are evicted
+        once it is exceeded. 0 disables the in-memory cache.
+    ttl : float, optional
+        Number of seconds a frame containing the current season is kept
+        before it is loaded again. Frames of past seasons do not expire.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> set_memory_cache_options(max_bytes=2 * 1024 ** 3, ttl=60)
+    >>> set_memory_cache_options(max_bytes=0)
+    """
+    if max_bytes is not None:
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError(f"Expected max_bytes to be a non-negative int, got {max_bytes!r}")
+        _options["max_bytes"] = max_bytes
+    if ttl is not None:
+        if ttl < 0:
+            raise ValueError(f"Expected ttl to be non-negative, got {ttl!r}")
+        _options["ttl"] = float(ttl)
+    with _lock:
+        _evict()
+
+
+def clear_memory_cache():
+    """
+    Remove every frame from the in-memory cache.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> clear_memory_cache()
+    """
+    global _size
+    with _lock:
+        _entries.clear()
+        _size = 0
+
+
+def memoize(func):
+    """
+    Cache the frames returned by a ``load_cebl_*`` function in memory.
+
+    Calls are keyed by function and arguments, with ``seasons=None``
+    equivalent to listing every season. Each call returns a copy of the
+    cached frame, so callers cannot modify the cached data.
+
+    Parameters
+    ----------
+    func : callable
+        A function taking ``seasons`` and returning a pandas.DataFrame.
+
+    Returns
+    -------
+    callable
+        The memoized function.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _options["max_bytes"] == 0:
+            return func(*args, **kwargs)
+        key, seasons = _key(func.__name__, signature, args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+
+        df = _get(key)
+        if df is None:
+            df = func(*args, **kwargs)
+            _put(key, df, seasons)
+        return df.copy()
+
+    return wrapper
+
+
+def _invalidate(name, season):
+    """
+    Remove the cached frames of the function ``name`` containing ``season``.
+    """
+    with _lock:
+        for key in [k for k in _entries if k[0] == name and season in dict(k[1:])["seasons"]]:
+            _remove(key)
+
+
+def _key(name, signature, args, kwargs):
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        return None, None
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    for argument in _IGNORED_ARGUMENTS:
+        arguments.pop(argument, None)
+
+    seasons = arguments.get("seasons")
+    if seasons is None:
+        seasons = list(range(2019, datetime.now().year + 1))
+    elif isinstance(seasons, int):
+        seasons = [seasons]
+    arguments["seasons"] = seasons
+
+    key = [name]
+    for argument, value in sorted(arguments.items()):
+        if isinstance(value, list):
+            value = tuple(value)
+        try:
+            hash(value)
+        except TypeError:
+            # invalid arguments, let the function raise
+            return None, None
+        key.append((argument, value))
+    return tuple(key), seasons
+
+
+def _get(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        df, size, expires = entry
+        if _expired(expires):
+            _remove(key)
+            return None
+        _entries.move_to_end(key)
+        return df
+
+
+def _put(key, df, seasons):
+    global _size
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    if size > _options["max_bytes"]:
+        return
+    expires = _expires(seasons)
+    with _lock:
+        if key in _entries:
+            _remove(key)
+        _entries[key] = (df, size, expires)
+        _size += size
+        _evict()
+
+
+def _expires(seasons):
+    """
+    Return the time.monotonic() deadline of data containing ``seasons``, or
+    None if it does not expire. Also used by the caches of derived data.
+    """
+    if datetime.now().year not in seasons:
+        return None
+    return time.monotonic() + _options["ttl"]
+
+
+def _expired(expires):
+    return expires is not None and time.monotonic() > expires
+
+
+def _remove(key):
+    global _size
+    _, size, _ = _entries.pop(key)
+    _size -= size
+
+
+def _evict():
+    while _entries and _size > _options["max_bytes"]:
+        _remove(next(iter(_entries)))
@@ -0,0 +1,163 @@
+"""
+Lazy queries over the cleaned CEBL datasets.
+
+A :class:`CeblDataset` records the seasons, filters and columns of a query
+without loading anything. Calling :meth:`CeblDataset.collect` pushes them
+down to the Parquet copies kept in the cache, so only the matching season
+files and row groups, and only the selected columns, are read.
+"""
+import numbers
+
+import pandas as pd
+
+from . import helpers as h
+from . import instrument
+from . import store
+from .ceblpy import _URLS
+
+
+def dataset(name):
+    """
+    Return a lazy handle on a cleaned CEBL dataset.
+
+    Parameters
+    ----------
+    name : str
+        One of "schedule", "team_boxscore", "player_boxscore", "officials",
+        "coaches" or "pbp".
+
+    Returns
+    -------
+    CeblDataset
+        A query selecting every row and column of the dataset.
+
+    Examples
+    --------
+    >>> dataset("pbp").filter(season=2024, action_type=["2pt", "3pt"]).select("game_id", "x", "y").collect()
+    """
+    h.validate_dataset(name)
+    return CeblDataset(name)
+
+
+class CeblDataset:
+    """
+    Lazy query over a cleaned CEBL dataset, created with :func:`dataset`.
+
+    :meth:`filter` and :meth:`select` return new queries and never read
+    data, so queries can be built step by step and reused. Only
+    :meth:`collect` loads the matching rows.
+    """
+
+    def __init__(self, name, seasons=None, filters=None, columns=None):
+        self.name = name
+        self.seasons = seasons
+        self.filters = filters or {}
+        self.columns = columns
+
+    def filter(self, **conditions):
+        """
+        Keep the rows matching every condition.
+
+        Parameters
+        ----------
+        **conditions : scalar or list
+            Allowed value, or list of allowed values, keyed by column name,
+            e.g. ``team_id=...``, ``player_id=...`` or ``action_type=...``.
+            ``season`` selects the season files or partitions to scan.
+            Filtering the same column twice keeps the values allowed by both.
+            Unknown columns, and values that do not match the type of their
+            column, raise a ValueError when the query is collected.
+
+        Returns
+        -------
+        CeblDataset
+            The filtered query.
+
+        Examples
+        --------
+        >>> dataset("pbp").filter(season=[2023, 2024], player_id=12345)
+        """
+        seasons = self.seasons
+        filters = dict(self.filters)
+        for column, values in conditions.items():
+            values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+            invalid = [v for v in values if v is not None and not isinstance(v, (str, numbers.Number))]
+            if invalid:
+                raise ValueError(f"Expected str or numbers to filter {column!r}, got {invalid}")
+            if column == "season":
+                values = h.parse_seasons(values)
+                seasons = values if seasons is None else [s for s in seasons if s in values]
+            elif column in filters:
+                filters[column] = [v for v in filters[column] if v in values]
+            else:
+                filters[column] = values
+        return CeblDataset(self.name, seasons, filters, self.columns)
+
+    def select(self, *columns):
+        """
+        Keep only the given columns.
+
+        Parameters
+        ----------
+        *columns : str
+            Column names. Filters may use columns that are not selected.
+
+        Returns
+        -------
+        CeblDataset
+            The projected query.
+
+        Examples
+        --------
+        >>> dataset("player_boxscore").select("player_name", "points")
+        """
+        columns = list(columns[0]) if len(columns) == 1 and isinstance(columns[0], (list, tuple)) else list(columns)
+        h.validate_columns(columns)
+        if self.columns is not None:
+            missing = [c for c in columns if c not in self.columns]
+            if missing:
+                raise ValueError(f"Columns {missing} were not selected before")
+        return CeblDataset(self.name, self.seasons, self.filters, columns)
+
+    def collect(self, compact=False):
+        """
+        Load the rows and columns selected by the query.
+
+        Parameters
+        ----------
+        compact : bool, default False
+            If True, use memory-efficient dtypes.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The matching rows, in release order.
+
+        Examples
+        --------
+        >>> dataset("pbp").filter(season=2024, team_id=1).collect()
+        """
+        seasons = h.parse_seasons(self.seasons)
+        if self.name == "pbp":
+            frames = [
+                store.scan_asset(_URLS["pbp"].format(season=season), self.columns, self.filters)
+                for season in seasons
+            ]
+            with instrument.stage("concat") as record:
+                df = pd.concat(frames) if frames else pd.DataFrame()
+                record["rows"] = len(df)
+        else:
+            df = store.scan_seasons(_URLS[self.name], seasons, self.columns, self.filters)
+        if compact:
+            df = h.compact_dtypes(df)
+        return df
+
+    def __repr__(self):
+        parts = [repr(self.name)]
+        if self.seasons is not None:
+            parts.append(f"seasons={self.seasons!r}")
+        if self.filters:
+            parts.append(f"filters={self.filters!r}")
+        if self.columns is not None:
+            parts.append(f"columns={self.columns!r}")
+        return f"CeblDataset({', '.join(parts)})"
@@ -0,0 +1,220 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import ceblpy
+from . import helpers as h
+from . import memo
+
+# pbp columns needed to bin the shots
+_COLUMNS = ["season", "team_id", "player_id", "action_type", "success", "x", "y"]
+_POINTS = {"2pt": 2, "3pt": 3}
+_KEYS = ["season", "team_id", "player_id"]
+_STATS = ["attempts", "makes", "points"]
+
+# (season, bins, size) -> {"shots": binned shots of the season, "expires": deadline or None}
+_charts = {}
+_lock = threading.Lock()
+
+
+def bin_shots(pbp, bins="grid", size=5.0):
+    """
+    Count the field goal attempts of play-by-play data by court location.
+
+    Every 2pt and 3pt shot with a location is assigned to a bin with NumPy
+    arithmetic on the ``x`` and ``y`` coordinates, then the attempts, makes
+    and points of each season, team, player and bin are summed in a single
+    grouped pass.
+
+    Parameters
+    ----------
+    pbp : pandas.DataFrame
+        Play-by-play data, as returned by :func:`ceblpy.ceblpy.load_cebl_pbp`.
+        Must contain the ``season``, ``team_id``, ``player_id``,
+        ``action_type``, ``success``, ``x`` and ``y`` columns.
+    bins : {"grid", "hex"}, default "grid"
+        Square bins of side ``size``, or hexagonal bins whose centres are
+        ``size`` apart.
+    size : float, default 5.0
+        Size of the bins, in court coordinates.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per season, team, player and bin with at least one attempt:
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        season                             int
+        team_id                            int
+        player_id                          int
+        x                                  float
+        y                                  float
+        attempts                           int
+        makes                              int
+        points                             int
+        ================================  ===========
+
+        ``x`` and ``y`` are the coordinates of the bin centre.
+
+    Examples
+    --------
+    >>> bin_shots(load_cebl_pbp(2024), bins="hex", size=4)
+    """
+    _validate_bins(bins, size)
+    missing = [c for c in _COLUMNS if c not in pbp.columns]
+    if missing:
+        raise ValueError(f"pbp is missing the columns {missing} needed to bin the shots")
+
+    action = pbp["action_type"]
+    shots = pbp.loc[action.isin(list(_POINTS)) & pbp["x"].notna() & pbp["y"].notna(), _COLUMNS]
+    x = shots["x"].to_numpy(dtype=float)
+    y = shots["y"].to_numpy(dtype=float)
+    columns, rows = (_hex_bins if bins == "hex" else _grid_bins)(x, y, size)
+
+    made = shots["success"].fillna(0).to_numpy(dtype=np.int64) == 1
+    value = np.where((shots["action_type"] == "3pt").to_numpy(), 3, 2)
+    binned = shots[_KEYS].copy()
+    binned["column"] = columns
+    binned["row"] = rows
+    binned["attempts"] = np.int64(1)
+    binned["makes"] = made.astype(np.int64)
+    binned["points"] = value * made
+    binned = binned.groupby([*_KEYS, "column", "row"], sort=True, dropna=False).sum().reset_index()
+
+    centres = (_hex_centres if bins == "hex" else _grid_centres)(binned.pop("column").to_numpy(),
+                                                                   binned.pop("row").to_numpy(), size)
+    binned.insert(len(_KEYS), "x", centres[0])
+    binned.insert(len(_KEYS) + 1, "y", centres[1])
+    return binned
+
+
+def shot_chart(seasons=None, player_id=None, team_id=None, bins="grid", size=5.0):
+    """
+    Shot chart of a player, a team or the whole league.
+
+    The shots of each season are binned once with :func:`bin_shots` and
+    cached for each binning, so later charts of any player or team only
+    select and sum the cached bins. The bins of the current season expire
+    after the TTL of the in-memory cache (see
+    :func:`ceblpy.memo.set_memory_cache_options`), so new games are picked up.
+
+    Parameters
+    ----------
+    seasons : int, list of int, or None, optional
+        Season(s) to include. By default, None includes all available seasons.
+    player_id : int or list of int, optional
+        Only include the shots of these players.
+    team_id : int or list of int, optional
+        Only include the shots of these teams.
+    bins : {"grid", "hex"}, default "grid"
+        Square or hexagonal bins, see :func:`bin_shots`.
+    size : float, default 5.0
+        Size of the bins, in court coordinates.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per bin with at least one attempt, with the ``x`` and ``y``
+        coordinates of the bin centre, the ``attempts``, ``makes`` and
+        ``points`` summed over the selected seasons, and:
+
+        ================================  ===========
+        Column Name                        Type
+        ================================  ===========
+        field_goal_percentage              float
+        points_per_attempt                 float
+        ================================  ===========
+
+    Examples
+    --------
+    >>> shot_chart(player_id=12345)
+    >>> shot_chart(2024, team_id=1, bins="hex", size=4)
+    """
+    seasons = h.parse_seasons(seasons)
+    _validate_bins(bins, size)
+    binned = _binned_seasons(seasons, bins, float(size))
+    keep = np.ones(len(binned), dtype=bool)
+    for column, values in (("player_id", player_id), ("team_id", team_id)):
+        if values is not None:
+            values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+            keep &= binned[column].isin(values).to_numpy()
+
+    chart = binned.loc[keep, ["x", "y", *_STATS]].groupby(["x", "y"], sort=True).sum().reset_index()
+    attempts = chart["attempts"].astype(float)
+    chart["field_goal_percentage"] = 100 * chart["makes"] / attempts
+    chart["points_per_attempt"] = chart["points"] / attempts
+    return chart
+
+
+def clear_shot_charts():
+    """
+    Remove every cached binned season.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> clear_shot_charts()
+    """
+    with _lock:
+        _charts.clear()
+
+
+def _binned_seasons(seasons, bins, size):
+    with _lock:
+        cached = {season: _charts.get((season, bins, size)) for season in seasons}
+    missing = [season for season, entry in cached.items() if entry is None or memo._expired(entry["expires"])]
+    if missing:
+        # binned shots of the current season expire like the loaded frames
+        expires = {season: memo._expires([season]) for season in missing}
+        binned = bin_shots(ceblpy._LOADERS["pbp"](missing, columns=_COLUMNS), bins, size)
+        with _lock:
+            for season in missing:
+                cached[season] = {"shots": binned[binned["season"] == season], "expires": expires[season]}
+                _charts[(season, bins, size)] = cached[season]
+    frames = [cached[season]["shots"] for season in seasons]
+    return pd.concat(frames) if frames else pd.DataFrame(columns=[*_KEYS, "x", "y", *_STATS])
+
+
+def _validate_bins(bins, size):
+    if bins not in ("grid", "hex"):
+        raise ValueError(f"Invalid bins {bins!r}, expected 'grid' or 'hex'")
+    if not size > 0:
+        raise ValueError(f"Invalid bin size {size!r}, expected a positive number")
+
+
+def _grid_bins(x, y, size):
+    return np.floor(x / size).astype(np.int64), np.floor(y / size).astype(np.int64)
+
+
+def _grid_centres(columns, rows, size):
+    return (columns + 0.5) * size, (rows + 0.5) * size
+
+
+def _hex_bins(x, y, size):
+    """
+    Return the doubled lattice coordinates of the nearest hexagon centre.
+
+    The centres form two rectangular lattices, (i, j) and (i + 1/2, j + 1/2)
+    in units of ``size`` by ``size * sqrt(3)``. Each point is rounded to
+    the nearest centre of both lattices and keeps the closer one.
+    """
+    height = size * np.sqrt(3)
+    u, v = x / size, y / height
+    first = np.round(u), np.round(v)
+    second = np.floor(u) + 0.5, np.floor(v) + 0.5
+    # distances in court units, so the vertical offsets are scaled back
+    near_first = ((u - first[0]) ** 2 + 3 * (v - first[1]) ** 2
+                  <= (u - second[0]) ** 2 + 3 * (v - second[1]) ** 2)
+    columns = 2 * np.where(near_first, first[0], second[0])
+    rows = 2 * np.where(near_first, first[1], second[1])
+    return columns.astype(np.int64), rows.astype(np.int64)
+
+
+def _hex_centres(columns, rows, size):
+    return columns * size / 2, rows * size * np.sqrt(3) / 2
@@ -0,0 +1,856 @@
+import contextlib
+import functools
+import gzip
+import numbers
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from . import cache
+from . import instrument
+
+try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# small row groups let single-game reads and filters skip most of a file
+ROW_GROUP_SIZE = 10000
+# seconds superseded season partitions are kept for the readers still using
+# them, and seconds after which an incomplete rebuild is considered abandoned
+_SUPERSEDED_GRACE = 60
+_ABANDONED_GRACE = 3600
+# errors of data that cannot be stored as parquet, the csv is read instead
+_CONVERSION_ERRORS = (pyarrow.ArrowException, ValueError, TypeError) if pyarrow is not None else ()
+
+
+def read_asset(url, columns=None, path=None, memory_map=False):
+    """
+    Read a release asset, using a columnar copy of it when available.
+
+    The first read of a cached CSV asset converts it to a typed Parquet file
+    stored next to it in the cache. Later reads load the Parquet file, which
+    is much faster than parsing the CSV and can read a subset of columns
+    without parsing the rest. The Parquet copy is rebuilt whenever the CSV
+    is downloaded again. Requires the optional ``pyarrow`` dependency,
+    otherwise the CSV is parsed on every read.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+    path : str or file-like, optional
+        Local copy of the asset, as returned by :func:`ceblpy.cache.fetch`,
+        or a buffer holding it. By default, the asset is fetched from ``url``.
+    memory_map : bool, default False
+        If True, read the asset from an uncompressed Arrow IPC copy stored
+        next to it, memory-mapped without copying. See :func:`map_arrow`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The contents of the asset.
+
+    Examples
+    --------
+    >>> read_asset("https://github.com/ryanndu/cebl-data/releases/download/coaches/cebl_coaches.csv")
+    """
+    if path is None:
+        path = cache.fetch(url)
+    if memory_map:
+        _check_mappable(path, url)
+        arrow = cache.derived_path(path, ".arrow")
+        if not _is_fresh(arrow, path):
+            _write_arrow(read_asset(url, path=path), arrow)
+        return map_arrow(arrow, url, columns=columns)
+    if not _materializable(path, url):
+        return _read_csv(path, url, usecols=columns)
+
+    parquet = cache.derived_path(path, ".parquet")
+    if not _is_fresh(parquet, path):
+        df = _read_csv(path, url)
+        _write_parquet(df, parquet)
+        return df[columns] if columns is not None else df
+    return _read_parquet(parquet, url, columns=columns)
+
+
+def read_game(url, game_id, columns=None, partitioned=False, path=None):
+    """
+    Read the rows of one game from a release asset.
+
+    The rows are located with a game index built when the asset is
+    converted to Parquet, mapping each ``game_id`` to the file and row range
+    holding it, so only the row groups of that range are read. Requires the
+    optional ``pyarrow`` dependency, otherwise the CSV is parsed and
+    filtered.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset. The asset must have a ``game_id`` column,
+        or a ``fiba_id`` column for the schedule.
+    game_id : int
+        Game to read.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+    partitioned : bool, default False
+        Whether the asset is a single-file release stored as season
+        partitions (see :func:`read_seasons`).
+    path : str or file-like, optional
+        Local copy of the asset, as returned by :func:`ceblpy.cache.fetch`,
+        or a buffer holding it. By default, the asset is fetched from ``url``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The rows of the game. Empty if the game is not in the asset.
+
+    Examples
+    --------
+    >>> read_game("https://github.com/ryanndu/cebl-data/releases/download/pbp/cebl_pbp_2024.csv", 2400360)
+    """
+    if path is None:
+        path = cache.fetch(url)
+    if not _materializable(path, url):
+        return _filter_game(_read_csv(path, url), game_id, url, columns)
+
+    if partitioned:
+        parts = partition_dir(path)
+        if not _is_fresh(parts / "_index.parquet", path):
+            df = _read_csv(path, url)
+            _write_partitions(df, path)
+            parts = partition_dir(path)
+            if not _is_fresh(parts / "_index.parquet", path):
+                return _filter_game(df, game_id, url, columns)
+        index = parts / "_index.parquet"
+        empty = parts / "_empty.parquet"
+    else:
+        parquet = cache.derived_path(path, ".parquet")
+        index = cache.derived_path(path, ".index.parquet")
+        empty = parquet
+        if not (_is_fresh(parquet, path) and _is_fresh(index, path)):
+            df = _read_csv(path, url)
+            _write_parquet(df, parquet)
+            if not (_is_fresh(parquet, path) and _is_fresh(index, path)):
+                return _filter_game(df, game_id, url, columns)
+
+    entry = _load_index(str(index), os.path.getmtime(index)).get(game_id)
+    if entry is None:
+        return _read_rows(empty, 0, 0, columns)
+    file, start, stop = entry
+    game_column = _game_column(pyarrow.parquet.read_schema(empty).names)
+    read_columns = None if columns is None else list(dict.fromkeys(columns + [game_column]))
+    with instrument.stage("parse", url) as record:
+        df = _read_rows(index.parent / file, start, stop, read_columns)
+        df = df[df[game_column] == game_id]
+        record["rows"] = len(df)
+    return df[columns] if columns is not None else df
+
+
+def read_seasons(url, seasons, columns=None, path=None, memory_map=False):
+    """
+    Read the rows of the given seasons from a single-file release asset.
+
+    The first read of a cached CSV asset splits it into one Parquet partition
+    per season, stored next to it in the cache. Later reads only load the
+    partitions of the requested seasons, so time and memory scale with the
+    requested seasons rather than the full league history. Rows keep the
+    index and order they have in the release. Requires the optional
+    ``pyarrow`` dependency, otherwise the CSV is parsed and filtered.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset. The asset must have a ``season`` column.
+    seasons : list of int
+        Seasons to read.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+    path : str or file-like, optional
+        Local copy of the asset, as returned by :func:`ceblpy.cache.fetch`,
+        or a buffer holding it. By default, the asset is fetched from ``url``.
+    memory_map : bool, default False
+        If True, read the partitions from uncompressed Arrow IPC copies
+        stored with them, memory-mapped without copying. See :func:`map_arrow`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The rows of the requested seasons.
+
+    Examples
+    --------
+    >>> read_seasons("https://github.com/ryanndu/cebl-data/releases/download/coaches/cebl_coaches.csv", [2024])
+    """
+    if path is None:
+        path = cache.fetch(url)
+    if memory_map:
+        _check_mappable(path, url)
+    elif not _materializable(path, url):
+        read_columns = None if columns is None else list(dict.fromkeys(columns + ["season"]))
+        return _filter_seasons(_read_csv(path, url, usecols=read_columns), seasons, url, columns)
+
+    parts = partition_dir(path)
+    if not _is_fresh(parts / "_empty.parquet", path):
+        df = _read_csv(path, url)
+        _write_partitions(df, path)
+        parts = partition_dir(path)
+        if not _is_fresh(parts / "_empty.parquet", path):
+            if memory_map:
+                # raises, the partitions to map could not be written
+                _check_mappable(path, url)
+            return _filter_seasons(df, seasons, url, columns)
+
+    # duplicate seasons are read once, as when filtering the csv
+    files = [parts / f"season={season}.parquet" for season in dict.fromkeys(seasons)]
+    files = [f for f in files if f.exists()] or [parts / "_empty.parquet"]
+    if memory_map:
+        frames = [map_arrow(_arrow_partition(f), url, columns=columns) for f in files]
+    else:
+        frames = [_read_parquet(f, url, columns=columns) for f in files]
+    if len(frames) == 1:
+        return frames[0]
+    with instrument.stage("concat", url) as record:
+        df = pd.concat(frames)
+        # partitions are usually in release order already, and sorting
+        # would copy memory-mapped columns
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        record["rows"] = len(df)
+    return df
+
+
+def iter_asset(url, chunksize, columns=None):
+    """
+    Read a release asset in chunks of at most ``chunksize`` rows.
+
+    Chunks are read from the columnar copy of the asset when it exists and
+    streamed from the CSV otherwise, so at most one chunk is held in memory.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    chunksize : int
+        Maximum number of rows per chunk.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks of the asset.
+
+    Examples
+    --------
+    >>> for chunk in iter_asset("https://github.com/ryanndu/cebl-data/releases/download/pbp/cebl_pbp_2024.csv", 10000):
+    ...     print(len(chunk))
+    """
+    path = cache.fetch(url)
+    parquet = cache.derived_path(path, ".parquet")
+    if _materializable(path, url) and _is_fresh(parquet, path):
+        yield from _iter_parquet(parquet, chunksize, columns)
+    else:
+        with _csv_source(path, url) as source:
+            yield from pd.read_csv(source, usecols=columns, chunksize=chunksize)
+
+
+def iter_seasons(url, seasons, chunksize, columns=None):
+    """
+    Read the rows of the given seasons from a single-file release asset in chunks.
+
+    Chunks are read from the season partitions of the asset when they exist
+    and streamed from the CSV otherwise, so at most one chunk is held in
+    memory.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset. The asset must have a ``season`` column.
+    seasons : list of int
+        Seasons to read.
+    chunksize : int
+        Maximum number of rows per chunk.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks of the rows of the requested seasons.
+
+    Examples
+    --------
+    >>> for chunk in iter_seasons("https://github.com/ryanndu/cebl-data/releases/download/player-boxscore/cebl_players.csv", [2024], 10000):
+    ...     print(len(chunk))
+    """
+    path = cache.fetch(url)
+    parts = partition_dir(path)
+    if _materializable(path, url) and _is_fresh(parts / "_empty.parquet", path):
+        for season in dict.fromkeys(seasons):
+            file = parts / f"season={season}.parquet"
+            if file.exists():
+                yield from _iter_parquet(file, chunksize, columns)
+        return
+
+    read_columns = None if columns is None else list(dict.fromkeys(columns + ["season"]))
+    with _csv_source(path, url) as source:
+        for chunk in pd.read_csv(source, usecols=read_columns, chunksize=chunksize):
+            chunk = chunk[chunk['season'].isin(seasons)]
+            if len(chunk):
+                yield chunk[columns] if columns is not None else chunk
+
+
+def materialize(url, partitioned=False, path=None):
+    """
+    Build the columnar copies of a cached asset ahead of the first read.
+
+    Does nothing if the copies are up to date, or without the optional
+    ``pyarrow`` dependency or the on-disk cache.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    partitioned : bool, default False
+        Whether the asset is a single-file release read by season (see
+        :func:`read_seasons`), rather than by file (see :func:`read_asset`).
+    path : str, optional
+        Local copy of the asset, as returned by :func:`ceblpy.cache.fetch`.
+        By default, the asset is fetched from ``url``.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> materialize("https://github.com/ryanndu/cebl-data/releases/download/coaches/cebl_coaches.csv", partitioned=True)
+    """
+    if path is None:
+        path = cache.fetch(url)
+    if not _materializable(path, url):
+        return
+    if partitioned:
+        parts = partition_dir(path)
+        if not _is_fresh(parts / "_empty.parquet", path):
+            _write_partitions(_read_csv(path, url), path)
+    else:
+        parquet = cache.derived_path(path, ".parquet")
+        if not _is_fresh(parquet, path):
+            _write_parquet(_read_csv(path, url), parquet)
+
+
+def scan_asset(url, columns=None, filters=None):
+    """
+    Read the rows of a release asset matching the given filters.
+
+    Filters and columns are pushed down to the Parquet copy of the asset
+    (see :func:`read_asset`): row groups whose statistics exclude every
+    requested value are skipped, and only the requested columns are
+    decoded. Requires the optional ``pyarrow`` dependency, otherwise the
+    CSV is parsed and filtered.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+    filters : dict, optional
+        Allowed values of some columns, as lists keyed by column name.
+        Rows must match every column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The matching rows.
+
+    Examples
+    --------
+    >>> scan_asset("https://github.com/ryanndu/cebl-data/releases/download/pbp/cebl_pbp_2024.csv",
+    ...            columns=["game_id", "x", "y"], filters={"action_type": ["2pt", "3pt"]})
+    """
+    path = cache.fetch(url)
+    if not _materializable(path, url):
+        return _filter_frame(_read_csv(path, url), filters, url, columns)
+
+    parquet = cache.derived_path(path, ".parquet")
+    if not _is_fresh(parquet, path):
+        df = _read_csv(path, url)
+        _write_parquet(df, parquet)
+        if not _is_fresh(parquet, path):
+            return _filter_frame(df, filters, url, columns)
+    return _scan([parquet], url, columns, filters)
+
+
+def scan_seasons(url, seasons, columns=None, filters=None):
+    """
+    Read the rows of the given seasons of a single-file release asset matching the given filters.
+
+    Only the season partitions of the requested seasons are scanned (see
+    :func:`read_seasons`), and filters and columns are pushed down to them
+    as in :func:`scan_asset`. Requires the optional ``pyarrow`` dependency,
+    otherwise the CSV is parsed and filtered.
+
+    Parameters
+    ----------
+    url : str
+        URL of the release asset. The asset must have a ``season`` column.
+    seasons : list of int
+        Seasons to read.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+    filters : dict, optional
+        Allowed values of some columns, as lists keyed by column name.
+        Rows must match every column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The matching rows of the requested seasons.
+
+    Examples
+    --------
+    >>> scan_seasons("https://github.com/ryanndu/cebl-data/releases/download/player-boxscore/cebl_players.csv",
+    ...              [2023, 2024], filters={"team_name": ["Calgary Surge"]})
+    """
+    path = cache.fetch(url)
+    filters = {**(filters or {}), "season": list(seasons)}
+    if not _materializable(path, url):
+        return _filter_frame(_read_csv(path, url), filters, url, columns)
+
+    parts = partition_dir(path)
+    if not _is_fresh(parts / "_empty.parquet", path):
+        df = _read_csv(path, url)
+        _write_partitions(df, path)
+        parts = partition_dir(path)
+        if not _is_fresh(parts / "_empty.parquet", path):
+            return _filter_frame(df, filters, url, columns)
+    files = [parts / f"season={season}.parquet" for season in dict.fromkeys(seasons)]
+    return _scan([f for f in files if f.exists()] or [parts / "_empty.parquet"], url, columns, filters)
+
+
+def _scan(files, url, columns, filters):
+    schema = pyarrow.parquet.read_schema(files[0])
+    filters = _check_query(schema.empty_table().to_pandas().dtypes, columns, filters, url)
+    expression = None
+    for column, values in filters.items():
+        # values are cast to the type of the column, e.g. ints to doubles
+        condition = pyarrow.dataset.field(column).isin(pyarrow.array(values, type=schema.field(column).type))
+        expression = condition if expression is None else expression & condition
+    with instrument.stage("parse", url) as record:
+        scanned = pyarrow.dataset.dataset([str(f) for f in files], schema=schema, format="parquet")
+        table = scanned.to_table(columns=_with_index_columns(schema, columns), filter=expression)
+        df = table.to_pandas()
+        record["rows"] = len(df)
+        record["bytes"] = sum(os.path.getsize(f) for f in files)
+    return df
+
+
+def _filter_frame(df, filters, url, columns=None):
+    filters = _check_query(df.dtypes, columns, filters, url)
+    with instrument.stage("filter", url) as record:
+        for column, values in filters.items():
+            df = df[df[column].isin(values)]
+        record["rows"] = len(df)
+    return df[columns] if columns is not None else df
+
+
+def _filter_game(df, game_id, url, columns=None):
+    with instrument.stage("filter", url) as record:
+        df = df[df[_game_column(df.columns)] == game_id]
+        record["rows"] = len(df)
+    return df[columns] if columns is not None else df
+
+
+def _filter_seasons(df, seasons, url, columns=None):
+    with instrument.stage("filter", url) as record:
+        df = df[df['season'].isin(seasons)]
+        record["rows"] = len(df)
+    return df[columns] if columns is not None else df
+
+
+def _check_query(dtypes, columns, filters, url):
+    """
+    Return the filters with their values cast to the type of their column.
+
+    Raises ValueError for unknown columns, and for filter values that do
+    not match the type of their column, whether the asset is read from its
+    Parquet copy or its CSV.
+    """
+    unknown = [c for c in [*(columns or []), *(filters or {})] if c not in dtypes]
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown} for {url}")
+    checked = {}
+    for column, values in (filters or {}).items():
+        dtype = dtypes[column]
+        if pd.api.types.is_bool_dtype(dtype):
+            valid = [v for v in values if isinstance(v, bool)]
+        elif pd.api.types.is_integer_dtype(dtype):
+            # integral floats, e.g. ids read from a float column elsewhere, are cast
+            valid = [int(v) for v in values if isinstance(v, numbers.Real) and not isinstance(v, bool)
+                     and float(v).is_integer()]
+        elif pd.api.types.is_float_dtype(dtype):
+            valid = [float(v) for v in values if isinstance(v, numbers.Real) and not isinstance(v, bool)]
+        elif pd.api.types.is_string_dtype(dtype):
+            valid = [v for v in values if isinstance(v, str)]
+        else:
+            checked[column] = values
+            continue
+        if len(valid) != len([v for v in values if v is not None]):
+            invalid = [v for v in values if v is not None and v not in valid]
+            raise ValueError(f"Filter values {invalid} do not match the {dtype} column {column!r}")
+        if any(v is None for v in values):
+            valid.append(None)
+        checked[column] = valid
+    return checked
+
+
+def _iter_parquet(path, chunksize, columns=None):
+    file = pyarrow.parquet.ParquetFile(path)
+    start = 0
+    for batch in file.iter_batches(batch_size=chunksize, columns=_with_index_columns(file.schema_arrow, columns)):
+        chunk = batch.to_pandas()
+        if isinstance(chunk.index, pd.RangeIndex):
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def map_arrow(path, url=None, columns=None):
+    """
+    Read an uncompressed Arrow IPC (Feather v2) file without copying it.
+
+    The file is memory-mapped and its columns are wrapped in
+    ``pandas.ArrowDtype`` arrays pointing into the mapping, so reading it
+    allocates almost nothing and every process mapping the same file shares
+    a single physical copy of the data through the operating system page
+    cache. Requires the optional ``pyarrow`` dependency.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the Arrow file.
+    url : str, optional
+        URL of the release asset the file was derived from, reported to the
+        stage hooks.
+    columns : list of str, optional
+        Columns to read. By default, all columns are read.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The contents of the file, with ``pandas.ArrowDtype`` columns.
+
+    Examples
+    --------
+    >>> map_arrow(cache.derived_path(cache.fetch(url), ".arrow"))
+    """
+    with instrument.stage("parse", url) as record:
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(os.fspath(path))).read_all()
+        if columns is not None:
+            table = table.select(_with_index_columns(table.schema, columns))
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        if isinstance(df.index.dtype, pd.ArrowDtype):
+            # the index is small, keep it a regular NumPy index
+            df.index = pd.Index(df.index.to_numpy(), name=df.index.name)
+        record["rows"] = len(df)
+        record["bytes"] = os.path.getsize(path)
+    return df
+
+
+def partition_dir(path):
+    """
+    Return the directory holding the season partitions of a cached asset.
+
+    Partitions are rebuilt in a new directory, and a small pointer file
+    next to the asset is switched to it atomically once it is complete, so
+    concurrent readers and writers never see a partial rebuild.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Path of the cached asset, as returned by :func:`ceblpy.cache.fetch`.
+
+    Returns
+    -------
+    pathlib.Path
+        Current directory with one ``season=<year>.parquet`` file per season.
+
+    Examples
+    --------
+    >>> partition_dir(cache.fetch(url))
+    """
+    try:
+        with open(cache.derived_path(path, ".parts.current")) as f:
+            return Path(path).parent / f.read().strip()
+    except FileNotFoundError:
+        # not partitioned yet, or partitioned before the pointer existed
+        return cache.derived_path(path, ".parts")
+
+
+def _write_partitions(df, path):
+    current = partition_dir(path)
+    parts = Path(tempfile.mkdtemp(dir=current.parent, prefix=Path(path).name + ".parts."))
+    try:
+        indexes = []
+        for season, partition in df.groupby("season", sort=False):
+            file = f"season={season}.parquet"
+            partition.to_parquet(parts / file, index=True, row_group_size=ROW_GROUP_SIZE)
+            indexes.append(_game_index(partition, file))
+        pd.concat(indexes).to_parquet(parts / "_index.parquet", index=False)
+        # written last, marks the directory as complete
+        df.iloc[:0].to_parquet(parts / "_empty.parquet", index=True)
+    except _CONVERSION_ERRORS as e:
+        shutil.rmtree(parts, ignore_errors=True)
+        _conversion_error(path, e)
+        return
+    except BaseException:
+        shutil.rmtree(parts, ignore_errors=True)
+        raise
+
+    current = partition_dir(path)
+    if _is_fresh(current / "_empty.parquet", path):
+        # a concurrent writer already switched to an up-to-date rebuild
+        shutil.rmtree(parts, ignore_errors=True)
+    else:
+        with cache._part_file(cache.derived_path(path, ".parts.current")) as f:
+            f.write(parts.name.encode())
+        if current.is_dir():
+            # the grace period of superseded partitions starts now
+            os.utime(current)
+    _remove_stale_partitions(path)
+
+
+def _remove_stale_partitions(path):
+    """
+    Remove the partitions superseded long enough ago for their readers to
+    be done, and the rebuilds abandoned by crashed writers.
+    """
+    current = partition_dir(path)
+    path = Path(path)
+    now = time.time()
+    for parts in [*path.parent.glob(path.name + ".parts.*"), cache.derived_path(path, ".parts")]:
+        if parts == current or not parts.is_dir():
+            continue
+        try:
+            age = now - parts.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        complete = (parts / "_empty.parquet").exists()
+        if age > (_SUPERSEDED_GRACE if complete else _ABANDONED_GRACE):
+            shutil.rmtree(parts, ignore_errors=True)
+
+
+def _check_mappable(path, url):
+    if pyarrow is None:
+        raise ImportError("memory_map requires pyarrow, install it with `pip install ceblpy[parquet]`")
+    if not _cached(path, url):
+        raise ValueError("memory_map requires the on-disk cache to be enabled")
+    if _conversion_failed(path):
+        raise ValueError(f"memory_map is not available for {url}, it could not be converted to Arrow")
+
+
+def _arrow_partition(parquet):
+    arrow = parquet.with_suffix(".arrow")
+    if not _is_fresh(arrow, parquet):
+        _write_arrow(pd.read_parquet(parquet), arrow)
+    return arrow
+
+
+def _write_arrow(df, path):
+    # uncompressed, so the file can be mapped without decoding
+    table = pyarrow.Table.from_pandas(df)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pyarrow.ipc.new_file(tmp, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_csv(path, url, **kwargs):
+    with instrument.stage("parse", url) as record, _csv_source(path, url) as source:
+        df = pd.read_csv(source, **kwargs)
+        record["rows"] = len(df)
+        if isinstance(path, (str, os.PathLike)):
+            record["bytes"] = os.path.getsize(path) if os.path.exists(path) else 0
+    return df
+
+
+@contextlib.contextmanager
+def _csv_source(path, url):
+    """
+    Yield ``path``, or a stream decompressing it on the fly if the cached
+    asset is compressed. Time spent decompressing is reported as a
+    "decompress" stage.
+    """
+    encoding = cache.asset_encoding(path) if isinstance(path, (str, os.PathLike)) and path != url else None
+    if encoding is None:
+        yield path
+        return
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ImportError(f"{url} is cached zstd-compressed, install zstandard to read it")
+        raw = zstandard.open(path, "rb")
+    else:
+        raw = gzip.open(path, "rb")
+    reader = _DecompressingReader(raw)
+    try:
+        yield reader
+    finally:
+        raw.close()
+        instrument._record({"stage": "decompress", "url": url, "bytes": os.path.getsize(path),
+                            "rows": 0, "seconds": reader.seconds})
+
+
+class _DecompressingReader:
+    """
+    Binary file-like wrapper timing the reads of a decompressing stream.
+    """
+    mode = "rb"
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.seconds = 0.0
+
+    def read(self, size=-1):
+        return self._timed(self.raw.read, size)
+
+    def read1(self, size=-1):
+        return self._timed(self.raw.read1, size)
+
+    def _timed(self, read, size):
+        start = time.perf_counter()
+        try:
+            return read(size)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+def _read_parquet(path, url, **kwargs):
+    with instrument.stage("parse", url) as record:
+        df = pd.read_parquet(path, **kwargs)
+        record["rows"] = len(df)
+        record["bytes"] = os.path.getsize(path)
+    return df
+
+
+def _materializable(path, url):
+    # columnar copies need pyarrow, a cached file to store them next to, and
+    # an asset whose conversion did not fail before
+    return _cached(path, url) and pyarrow is not None and not _conversion_failed(path)
+
+
+def _cached(path, url):
+    return isinstance(path, (str, os.PathLike)) and path != url
+
+
+def _conversion_failed(path):
+    meta = cache._read_meta(Path(path))
+    return meta is not None and "conversion_error" in meta
+
+
+def _is_fresh(derived, source):
+    try:
+        return os.path.getmtime(derived) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def _write_parquet(df, path):
+    asset = path.with_name(path.name[:-len(".parquet")])
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_SIZE)
+        with cache._part_file(cache.derived_path(asset, ".index.parquet")) as f:
+            _game_index(df, path.name).to_parquet(f, index=False)
+        os.replace(tmp, path)
+    except _CONVERSION_ERRORS as e:
+        _conversion_error(asset, e)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
+
+
+def _conversion_error(asset, error):
+    warnings.warn(f"Could not convert {Path(asset).name} to parquet ({error}), reading csv instead")
+    # read the csv directly until the asset is downloaded again
+    with cache._lock:
+        meta = cache._read_meta(Path(asset))
+        if meta is not None:
+            meta["conversion_error"] = str(error)
+            cache._write_meta(Path(asset), meta)
+
+
+def _game_column(columns):
+    # the schedule identifies games by fiba_id, the other datasets by game_id
+    return "game_id" if "game_id" in columns else "fiba_id"
+
+
+def _game_index(df, file):
+    # rows of a game are contiguous in the releases, but store the full
+    # range between their first and last position to be safe
+    positions = pd.Series(range(len(df)), index=df[_game_column(df.columns)].to_numpy())
+    ranges = positions.groupby(level=0).agg(["min", "max"])
+    return pd.DataFrame({
+        "game_id": ranges.index,
+        "file": file,
+        "start": ranges["min"].to_numpy(),
+        "stop": ranges["max"].to_numpy() + 1,
+    })
+
+
+@functools.lru_cache(maxsize=64)
+def _load_index(path, mtime):
+    index = pd.read_parquet(path)
+    return dict(zip(index["game_id"].tolist(), zip(index["file"], index["start"].tolist(), index["stop"].tolist())))
+
+
+def _with_index_columns(schema, columns):
+    # keep the stored index so the rows have the same labels as full reads
+    if columns is None:
+        return None
+    index_columns = (schema.pandas_metadata or {}).get("index_columns", [])
+    return columns + [c for c in index_columns if isinstance(c, str) and c not in columns]
+
+
+def _read_rows(path, start, stop, columns=None):
+    file = pyarrow.parquet.ParquetFile(path)
+    groups = []
+    first = offset = 0
+    for i in range(file.num_row_groups):
+        rows = file.metadata.row_group(i).num_rows
+        if offset < stop and offset + rows > start:
+            if not groups:
+                first = offset
+            groups.append(i)
+        offset += rows
+    if not groups:
+        return file.schema_arrow.empty_table().to_pandas()[columns or slice(None)]
+    df = file.read_row_groups(groups, columns=_with_index_columns(file.schema_arrow, columns)).to_pandas()
+    if isinstance(df.index, pd.RangeIndex):
+        df.index = pd.RangeIndex(first, first + len(df))
+    return df.iloc[start - first:stop - first]
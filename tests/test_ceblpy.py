@@ -1 +1,596 @@
+import asyncio
+import functools
+import gzip
+import http.server
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import ceblpy as ceblpy_package
+from ceblpy import aggregates
 from ceblpy import ceblpy
+from ceblpy import cli
+from ceblpy import cache
+from ceblpy import store
+from ceblpy import helpers as h
+from ceblpy import instrument
+from ceblpy import joins
+from ceblpy import lineups
+from ceblpy import memo
+from ceblpy import shots
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        self.server.statuses.append(code)
+        super().send_response(code, message)
+
+    def do_GET(self):
+        if "Range" not in self.headers:
+            return super().do_GET()
+        with open(self.translate_path(self.path), "rb") as f:
+            data = f.read()
+        start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+        if start >= len(data):
+            return self.send_error(416)
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+@pytest.fixture
+def release_server(tmp_path):
+    """Serve ``tmp_path / "releases"`` over HTTP like the cebl data releases."""
+    root = tmp_path / "releases"
+    root.mkdir()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=root))
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+
+
+@pytest.fixture
+def releases(release_server, cache_dir, monkeypatch):
+    """Small schedule, boxscore, officials, coaches and pbp releases for 2023 and 2024."""
+    root, base, server = release_server
+    games = {2023: [2300101, 2300102], 2024: [2400201, 2400202]}
+    rows = {name: [] for name in ("schedule", "team-boxscore", "player-boxscore", "officials", "coaches")}
+    for season, ids in games.items():
+        pbp = []
+        for game_id in ids:
+            rows["schedule"].append({"fiba_id": game_id, "season": season, "home_team_id": 1, "away_team_id": 2})
+            for team in ("Home", "Away"):
+                rows["team-boxscore"].append({"game_id": game_id, "season": season, "team_name": team, "team_score": 80})
+                rows["coaches"].append({"game_id": game_id, "season": season, "team_name": team, "coach_name": f"{team} Coach"})
+                for number in range(5):
+                    rows["player-boxscore"].append({"game_id": game_id, "season": season, "team_name": team,
+                                                    "player_name": f"{team} {number}", "points": number})
+            rows["officials"].append({"game_id": game_id, "season": season, "officials_type": "referee", "officials_name": "Ref"})
+            for action_number in range(1, 11):
+                pbp.append({"game_id": game_id, "season": season, "action_number": action_number, "action_type": "2pt"})
+        (root / "pbp").mkdir(exist_ok=True)
+        pd.DataFrame(pbp).to_csv(root / "pbp" / f"cebl_pbp_{season}.csv", index=False)
+    files = {"schedule": "cebl_schedule.csv", "team-boxscore": "cebl_teams.csv", "player-boxscore": "cebl_players.csv",
+             "officials": "cebl_officials.csv", "coaches": "cebl_coaches.csv"}
+    for tag, file in files.items():
+        (root / tag).mkdir()
+        pd.DataFrame(rows[tag]).to_csv(root / tag / file, index=False)
+        monkeypatch.setitem(ceblpy._URLS, tag.replace("-", "_"), f"{base}/{tag}/{file}")
+    monkeypatch.setitem(ceblpy._URLS, "pbp", base + "/pbp/cebl_pbp_{season}.csv")
+    memo.clear_memory_cache()
+    yield games
+    memo.clear_memory_cache()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    options = cache.get_cache_options()
+    cache.set_cache_options(cache_dir=tmp_path / "cache", offline=False, enabled=True)
+    yield tmp_path / "cache"
+    cache.set_cache_options(**options)
+
+
+def test_import_is_lazy():
+    code = ("import sys, ceblpy; from ceblpy import helpers; ceblpy.__version__; helpers.parse_seasons(2024); "
+            "print(sorted(m for m in ('pandas', 'numpy', 'pyarrow', 'ceblpy.ceblpy') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_fetch_revalidates_cached_asset(release_server, cache_dir):
+    root, base, server = release_server
+    (root / "schedule").mkdir()
+    (root / "schedule" / "cebl_schedule.csv").write_text("season,id\n2024,1\n")
+
+    path = cache.fetch(f"{base}/schedule/cebl_schedule.csv")
+    assert open(path).read() == "season,id\n2024,1\n"
+    cache.fetch(f"{base}/schedule/cebl_schedule.csv")
+    assert server.statuses == [200, 304]
+
+
+def test_fetch_offline(release_server, cache_dir):
+    root, base, server = release_server
+    (root / "schedule").mkdir()
+    (root / "schedule" / "cebl_schedule.csv").write_text("season,id\n2024,1\n")
+    cache.fetch(f"{base}/schedule/cebl_schedule.csv")
+
+    cache.set_cache_options(offline=True)
+    cache.fetch(f"{base}/schedule/cebl_schedule.csv")
+    assert server.statuses == [200]
+    with pytest.raises(FileNotFoundError):
+        cache.fetch(f"{base}/pbp/cebl_pbp_2024.csv")
+
+
+def test_fetch_compressed_variant(release_server, cache_dir):
+    root, base, server = release_server
+    (root / "coaches").mkdir()
+    (root / "coaches" / "cebl_coaches.csv.gz").write_bytes(gzip.compress(b"game_id,season,coach_name\n1,2024,A\n2,2023,B\n"))
+    url = f"{base}/coaches/cebl_coaches.csv"
+    cache.set_cache_options(compressed_variants=True)
+    instrument.reset_stats()
+
+    try:
+        path = cache.fetch(url)
+        assert cache.asset_encoding(path) == "gzip"
+        assert path == str(cache_dir / "assets" / "coaches" / "cebl_coaches.csv")
+        assert store.read_seasons(url, [2023])["coach_name"].tolist() == ["B"]
+        assert instrument.stats()["decompress"]["calls"] >= 1
+        # the variant is revalidated, not the missing plain asset
+        cache.fetch(url)
+        assert server.statuses[-1] == 304
+    finally:
+        cache.set_cache_options(compressed_variants=False)
+
+
+def test_fetch_resumes_partial_download(release_server, cache_dir):
+    root, base, server = release_server
+    (root / "schedule").mkdir()
+    (root / "schedule" / "cebl_schedule.csv").write_text("season,id\n2024,1\n2024,2\n")
+    url = f"{base}/schedule/cebl_schedule.csv"
+    path = cache_dir / "assets" / "schedule" / "cebl_schedule.csv"
+    path.parent.mkdir(parents=True)
+    cache.derived_path(path, ".partial").write_text("season,id\n20")
+    cache.derived_path(path, ".partial.json").write_text(f'{{"source": "{url}", "validator": "x"}}')
+
+    assert open(cache.fetch(url)).read() == "season,id\n2024,1\n2024,2\n"
+    assert server.statuses == [206]
+    assert cache.verify(url)
+    path.write_text("season,id\n2024,1\n2024,3\n")
+    assert not cache.verify(url)
+    assert not path.exists()
+
+    # a partial the server cannot resume is discarded and downloaded whole
+    cache.derived_path(path, ".partial").write_text("season,id\n2024,1\n2024,2\n2024,3\n")
+    cache.derived_path(path, ".partial.json").write_text(f'{{"source": "{url}", "validator": "x"}}')
+    assert open(cache.fetch(url)).read() == "season,id\n2024,1\n2024,2\n"
+    assert server.statuses[-2:] == [416, 200]
+    assert not cache.derived_path(path, ".partial").exists()
+
+
+def test_cache_eviction(release_server, cache_dir):
+    root, base, server = release_server
+    (root / "pbp").mkdir()
+    for season in (2023, 2024):
+        (root / "pbp" / f"cebl_pbp_{season}.csv").write_text("x" * 100)
+
+    cache.set_cache_options(max_size=150)
+    cache.fetch(f"{base}/pbp/cebl_pbp_2023.csv")
+    cache.fetch(f"{base}/pbp/cebl_pbp_2024.csv")
+    assert sorted(p.name for p in (cache_dir / "assets" / "pbp").glob("*.csv")) == ["cebl_pbp_2024.csv"]
+
+
+def test_read_asset_materializes_parquet(release_server, cache_dir):
+    pytest.importorskip("pyarrow")
+    root, base, server = release_server
+    (root / "coaches").mkdir()
+    (root / "coaches" / "cebl_coaches.csv").write_text("game_id,season,coach_name\n1,2024,A\n2,2024,B\n")
+
+    first = store.read_asset(f"{base}/coaches/cebl_coaches.csv")
+    assert (cache_dir / "assets" / "coaches" / "cebl_coaches.csv.parquet").exists()
+    second = store.read_asset(f"{base}/coaches/cebl_coaches.csv", columns=["coach_name"])
+    assert second["coach_name"].tolist() == first["coach_name"].tolist() == ["A", "B"]
+
+
+def test_failed_conversion_is_remembered(release_server, cache_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    root, base, server = release_server
+    (root / "coaches").mkdir()
+    (root / "coaches" / "cebl_coaches.csv").write_text("game_id,season,coach_name\n1,2024,A\n")
+    url = f"{base}/coaches/cebl_coaches.csv"
+
+    def to_parquet(self, *args, **kwargs):
+        raise ValueError("unsupported column")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", to_parquet)
+    with pytest.warns(UserWarning, match="unsupported column"):
+        store.read_asset(url)
+    monkeypatch.undo()
+    assert store.read_asset(url)["coach_name"].tolist() == ["A"]
+    assert sorted(p.name for p in (cache_dir / "assets" / "coaches").iterdir()) == [
+        "cebl_coaches.csv", "cebl_coaches.csv.json"]
+
+
+def test_failed_partitioning_reads_csv(release_server, cache_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    root, base, server = release_server
+    (root / "coaches").mkdir()
+    (root / "coaches" / "cebl_coaches.csv").write_text("game_id,season,coach_name\n1,2023,A\n2,2024,B\n")
+    url = f"{base}/coaches/cebl_coaches.csv"
+
+    def to_parquet(self, *args, **kwargs):
+        raise ValueError("unsupported column")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", to_parquet)
+    with pytest.warns(UserWarning, match="unsupported column"):
+        assert store.read_seasons(url, [2024])["coach_name"].tolist() == ["B"]
+    assert store.read_game(url, 1, partitioned=True)["coach_name"].tolist() == ["A"]
+    assert store.scan_seasons(url, [2023, 2024], filters={"game_id": [2]})["coach_name"].tolist() == ["B"]
+    monkeypatch.undo()
+    assert store.read_seasons(url, [2023, 2024])["coach_name"].tolist() == ["A", "B"]
+    assert not list((cache_dir / "assets" / "coaches").glob("*.parts*"))
+
+
+def test_sync(releases, capsys):
+    assert cli.main(["sync", "--seasons", "2023", "2024", "--datasets", "coaches", "pbp", "--no-convert"]) == 0
+    assert cli.main(["sync", "--seasons", "2024", "--datasets", "coaches", "-q"]) == 0
+    err = capsys.readouterr().err
+    assert "[3/3]" in err and "3 downloaded" in err
+    cache.set_cache_options(offline=True)
+    statuses = cli.sync(2024, ["coaches"], progress=lambda *args: None)
+    assert list(statuses.values()) == ["unchanged"]
+    assert cache.get_cache_options()["offline"]
+
+
+def test_compact_dtypes():
+    df = pd.DataFrame({
+        "game_id": [2400360, 2400360, 2400354, 2400354],
+        "period": [1.0, 2.0, None, 4.0],
+        "x": [1.5, 2.25, 3.0, 4.0],
+        "action_type": ["2pt", "2pt", "3pt", "2pt"],
+        "start_time_utc": ["2024-05-22T23:30:00Z"] * 4,
+    })
+    compact = h.compact_dtypes(df)
+    assert str(compact["game_id"].dtype) == "Int32"
+    assert str(compact["period"].dtype) == "Int8"
+    assert compact["x"].dtype == df["x"].dtype
+    assert isinstance(compact["action_type"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(compact["start_time_utc"])
+
+
+def test_read_seasons_uses_partitions(release_server, cache_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    root, base, server = release_server
+    (root / "coaches").mkdir()
+    (root / "coaches" / "cebl_coaches.csv").write_text("game_id,season,coach_name\n3,2024,C\n1,2023,A\n2,2024,B\n")
+
+    url = f"{base}/coaches/cebl_coaches.csv"
+    both = store.read_seasons(url, [2024, 2023])
+    assert both.index.tolist() == [0, 1, 2]
+    parts = store.partition_dir(cache.fetch(url))
+    assert sorted(p.name for p in parts.glob("season=*")) == ["season=2023.parquet", "season=2024.parquet"]
+    assert store.read_seasons(url, [2024], columns=["coach_name"])["coach_name"].tolist() == ["C", "B"]
+    assert store.read_seasons(url, [2024, 2024])["coach_name"].tolist() == ["C", "B"]
+    assert len(store.scan_seasons(url, [2023, 2023])) == 1
+    assert store.read_seasons(url, [2019]).columns.tolist() == ["game_id", "season", "coach_name"]
+
+    # without the columnar copies, only the requested columns are parsed
+    parsed = []
+    read_csv = store._read_csv
+    monkeypatch.setattr(store, "_read_csv", lambda *args, **kwargs: parsed.append(kwargs) or read_csv(*args, **kwargs))
+    cache.set_cache_options(enabled=False)
+    assert store.read_seasons(url, [2024], columns=["coach_name"])["coach_name"].tolist() == ["C", "B"]
+    assert parsed == [{"usecols": ["coach_name", "season"]}]
+
+
+def test_memory_mapped_loads(releases):
+    pyarrow = pytest.importorskip("pyarrow")
+    expected = ceblpy.load_cebl_player_boxscore([2023, 2024])
+    allocated = pyarrow.total_allocated_bytes()
+    mapped = ceblpy.load_cebl_player_boxscore([2023, 2024], memory_map=True)
+    assert pyarrow.total_allocated_bytes() - allocated < 1024
+    assert isinstance(mapped["player_name"].dtype, pd.ArrowDtype)
+    pd.testing.assert_frame_equal(mapped.astype(expected.dtypes.to_dict()), expected)
+    pbp = ceblpy.load_cebl_pbp(2024, columns=["action_number"], memory_map=True)
+    assert pbp["action_number"].tolist() == list(range(1, 11)) * 2
+    with pytest.raises(ValueError):
+        ceblpy.load_cebl_coaches(memory_map=True, compact=True)
+
+
+def test_dataset_query(releases):
+    query = ceblpy_package.dataset("player_boxscore").filter(season=[2023, 2024], team_name="Away")
+    query = query.filter(player_name=["Away 1", "Away 3", "Home 1"]).select("player_name", "points")
+    players = query.collect()
+    expected = ceblpy.load_cebl_player_boxscore([2023, 2024])
+    expected = expected[(expected["team_name"] == "Away") & expected["player_name"].isin(["Away 1", "Away 3"])]
+    pd.testing.assert_frame_equal(players, expected[["player_name", "points"]])
+
+    pbp = ceblpy_package.dataset("pbp").filter(season=2024, game_id=2400202, action_number=[1, 2]).collect()
+    assert pbp[["game_id", "action_number"]].values.tolist() == [[2400202, 1], [2400202, 2]]
+    assert query.filter(season=2022).collect().empty
+
+    # the same errors whether the Parquet copies or the CSV files are read
+    for enabled in (True, False):
+        cache.set_cache_options(enabled=enabled)
+        with pytest.raises(ValueError, match="Unknown columns"):
+            ceblpy_package.dataset("pbp").filter(season=2024, shot_zone="paint").collect()
+        with pytest.raises(ValueError, match="do not match"):
+            ceblpy_package.dataset("coaches").filter(season=2024, game_id="2400202").collect()
+    assert len(ceblpy_package.dataset("pbp").filter(season=2024, action_number=1.0).collect()) == 2
+    with pytest.raises(ValueError):
+        ceblpy_package.dataset("pbp").filter(game_id=[[1, 2]])
+
+
+def test_iter_games_regroups_chunks():
+    df = pd.DataFrame({"game_id": [1, 1, 1, 2, 2, 3], "action_number": range(6)})
+    chunks = (df.iloc[i:i + 2] for i in range(0, len(df), 2))
+    games = list(ceblpy._iter_by(chunks, "game", columns=["action_number"]))
+    assert [g["action_number"].tolist() for g in games] == [[0, 1, 2], [3, 4], [5]]
+
+
+def test_loaders_are_memoized(monkeypatch):
+    calls = []
+
+    def read_seasons(url, seasons, columns=None, memory_map=False):
+        calls.append(seasons)
+        return pd.DataFrame({"game_id": [1, 2], "season": [2023, 2023]})
+
+    monkeypatch.setattr(store, "read_seasons", read_seasons)
+    memo.clear_memory_cache()
+    first = ceblpy.load_cebl_coaches(2023)
+    first.loc[0, "game_id"] = 99
+    second = ceblpy.load_cebl_coaches([2023])
+    assert calls == [[2023]]
+    assert second["game_id"].tolist() == [1, 2]
+    memo.clear_memory_cache()
+
+
+def test_refresh_cebl_data(monkeypatch):
+    fresh = pd.DataFrame({"game_id": [1, 1, 1], "season": [2024] * 3, "action_number": [1, 2, 3], "x": [1.0, 2.0, 7.0]})
+    monkeypatch.setattr(store, "read_asset", lambda url, columns=None, memory_map=False: fresh[columns] if columns else fresh)
+    monkeypatch.setitem(memo._options, "max_bytes", 1024 ** 2)
+    memo.clear_memory_cache()
+    frame = pd.concat([pd.DataFrame({"game_id": [9], "season": [2023], "action_number": [1], "x": [0.0]}),
+                       ceblpy.load_cebl_pbp(2024)], ignore_index=True)
+
+    fresh = pd.DataFrame({"game_id": [1, 1, 1, 2], "season": [2024] * 4, "action_number": [1, 2, 3, 1],
+                          "x": [1.0, 5.0, 7.0, 3.0]})
+    updated, delta = ceblpy.refresh_cebl_data(frame, "pbp", season=2024)
+    assert delta[["game_id", "action_number"]].values.tolist() == [[1, 2], [2, 1]]
+    assert updated[["game_id", "action_number", "x"]].values.tolist() == [
+        [9, 1, 0.0], [1, 1, 1.0], [1, 2, 5.0], [1, 3, 7.0], [2, 1, 3.0]]
+    assert ceblpy.load_cebl_pbp(2024)["x"].tolist() == [1.0, 5.0, 7.0, 3.0]
+
+    # compact frames hold pd.NA, and the fresh season is compacted with other categories
+    fresh = pd.DataFrame({"game_id": [1, 1, 2, 2], "season": [2024] * 4, "action_number": [1, 2, 1, 2],
+                          "action_type": ["2pt", "2pt", "3pt", "3pt"], "points": [2, None, 3, 3]})
+    memo.clear_memory_cache()
+    frame = ceblpy.load_cebl_pbp(2024, compact=True)
+    fresh = pd.DataFrame({"game_id": [1, 1, 2, 2, 3, 3], "season": [2024] * 6, "action_number": [1, 2, 1, 2, 1, 2],
+                          "action_type": ["2pt", "2pt", "3pt", "3pt", "ft", "ft"], "points": [2, 2, 3, 3, 1, None]})
+    updated, delta = ceblpy.refresh_cebl_data(frame, "pbp", season=2024, compact=True)
+    assert delta[["game_id", "action_number"]].values.tolist() == [[1, 2], [3, 1], [3, 2]]
+    assert updated.dtypes.astype(str).tolist() == frame.dtypes.astype(str).tolist()
+    assert updated["action_type"].tolist() == ["2pt", "2pt", "3pt", "3pt", "ft", "ft"]
+    assert updated["points"].tolist() == [2, 2, 3, 3, 1, pd.NA]
+    memo.clear_memory_cache()
+
+
+def test_load_cebl_game(releases, release_server):
+    pytest.importorskip("pyarrow")
+    game = ceblpy.load_cebl_game(2400202)
+    assert game["schedule"]["fiba_id"].tolist() == [2400202]
+    assert len(game["player_boxscore"]) == 10
+    assert game["pbp"]["action_number"].tolist() == list(range(1, 11))
+    assert game["team_boxscore"].index.tolist() == ceblpy.load_cebl_team_boxscore(2024).index[2:].tolist()
+    with pytest.raises(ValueError):
+        ceblpy.load_cebl_game(2400999)
+
+    # within max_age, lookups make no requests
+    cache.set_cache_options(max_age=60)
+    server = release_server[2]
+    requests = len(server.statuses)
+    assert len(ceblpy.load_cebl_game(2300101)["pbp"]) == 10
+    assert len(server.statuses) == requests + 1
+    ceblpy.load_cebl_game(2300102)
+    assert len(server.statuses) == requests + 1
+
+
+def test_aio_loaders(releases):
+    pytest.importorskip("aiohttp")
+    from ceblpy import aio
+
+    async def load():
+        return await asyncio.gather(aio.load_cebl_coaches(2024), aio.load_cebl_pbp([2024, 2023]))
+
+    coaches, pbp = asyncio.run(load())
+    pd.testing.assert_frame_equal(coaches, ceblpy.load_cebl_coaches(2024))
+    assert pbp["season"].tolist() == [2024] * 20 + [2023] * 20
+    assert cache.verify(ceblpy._URLS["coaches"])
+
+
+def test_load_cebl_all(releases):
+    data = ceblpy.load_cebl_all(2024, datasets=["schedule", "pbp"])
+    assert list(data) == ["schedule", "pbp"]
+    pd.testing.assert_frame_equal(data["pbp"], ceblpy.load_cebl_pbp(2024))
+    with pytest.raises(ValueError):
+        ceblpy.load_cebl_all(2024, datasets=["players"])
+
+
+def test_stage_hooks(releases):
+    records = []
+    ceblpy_package.reset_stats()
+    ceblpy_package.add_hook(records.append)
+    try:
+        ceblpy.load_cebl_pbp([2023, 2024])
+    finally:
+        ceblpy_package.remove_hook(records.append)
+    stages = [r["stage"] for r in records]
+    assert stages.count("download") == 2 and stages.count("parse") == 2 and stages[-1] == "concat"
+    summary = ceblpy_package.stats()
+    assert summary["download"]["bytes"] > 0
+    assert summary["concat"]["rows"] == 40
+
+
+def test_lineup_stints():
+    rows = []
+
+    def event(game_time, team_id, player_id, action_type, sub_type=None, home_score=0, away_score=0):
+        rows.append({"game_id": 1, "action_number": len(rows) + 1, "period": 1, "game_time": game_time,
+                     "team_id": team_id, "player_id": player_id, "action_type": action_type,
+                     "sub_type": sub_type, "home_score": home_score, "away_score": away_score})
+
+    for player_id in (1, 2, 3, 4, 5, 11, 12, 13, 14, 15):
+        event("09:50", 100 if player_id < 10 else 200, player_id, "rebound", "defensive")
+    event("09:00", 100, 1, "2pt", home_score=2)
+    event("08:00", 100, 5, "substitution", "out", home_score=2)
+    event("08:00", 100, 6, "substitution", "in", home_score=2)
+    event("07:00", 200, 11, "3pt", home_score=2, away_score=3)
+
+    stints = lineups.lineup_stints(pd.DataFrame(rows))
+    home = stints[stints["team_id"] == 100]
+    assert home["players"].tolist() == [(1, 2, 3, 4, 5), (1, 2, 3, 4, 6)]
+    assert home["seconds"].tolist() == [120.0, 480.0]
+    assert home["points_for"].tolist() == [2, 0]
+    assert home["points_against"].tolist() == [0, 3]
+    assert stints[stints["team_id"] == 200]["opponent_players"].tolist() == home["players"].tolist()
+
+
+def test_lineup_stints_before_home_team_scores():
+    rows = [{"game_id": 1, "action_number": i + 1, "period": 1, "game_time": "09:50", "team_id": team_id,
+             "player_id": player_id, "action_type": "rebound", "sub_type": "defensive", "home_score": 0,
+             "away_score": 0} for i, (team_id, player_id) in enumerate([(100, 1), (200, 11)])]
+    assert lineups.lineup_stints(pd.DataFrame(rows)).empty
+
+    rows.append({**rows[1], "action_number": 3, "game_time": "09:00", "action_type": "3pt", "away_score": 3})
+    stints = lineups.lineup_stints(pd.DataFrame(rows))
+    assert stints[["team_id", "opponent_id", "players", "points_for"]].values.tolist() == [
+        [100, 200, (1,), 0], [200, 100, (11,), 3]]
+
+
+def test_season_stats_update_incrementally(monkeypatch):
+    def boxscore(game_id, team, opponent, score, **stats):
+        return {"game_id": game_id, "season": 2024, "team_name": team, "minutes": "200:00", "team_score": score,
+                "field_goals_made": 30, "field_goals_attempted": 60, "three_point_field_goals_made": 10,
+                "three_point_field_goals_attempted": 25, "free_throws_made": 10, "free_throws_attempted": 20,
+                "offensive_rebounds": 10, "defensive_rebounds": 30, "rebounds": 40, "assists": 20, "turnovers": 12,
+                "steals": 5, "blocks": 3, "personal_fouls": 18, **stats}
+
+    teams = pd.DataFrame([boxscore(1, "A", "B", 80), boxscore(1, "B", "A", 70)])
+    players = pd.DataFrame([{**boxscore(1, team, None, 0), "player_name": f"{team} 1", "minutes": "40:00",
+                             "points": points, "plus_minus": 0} for team, points in [("A", 30), ("B", 20)]])
+    data = {"team_boxscore": teams, "player_boxscore": players}
+
+    def read_release(url, seasons, columns=None, compact=False, memory_map=False):
+        df = data["team_boxscore" if "teams" in url else "player_boxscore"]
+        return df.loc[df["season"].isin(seasons), columns or df.columns]
+
+    monkeypatch.setattr(ceblpy, "_read_release", read_release)
+    monkeypatch.setitem(memo._options, "max_bytes", 0)
+    aggregates.clear_season_stats()
+
+    stats = aggregates.team_season_stats(2024).set_index("team_name")
+    assert stats.loc["A", "possessions"] == 70.8
+    assert stats.loc["A", "offensive_rating"] == pytest.approx(100 * 80 / 70.8)
+    assert stats.loc["B", "defensive_rating"] == stats.loc["A", "offensive_rating"]
+    assert stats.loc["A", "effective_field_goal_percentage"] == 100 * 35 / 60
+    players_stats = aggregates.player_season_stats(2024).set_index("player_name")
+    assert players_stats.loc["A 1", "usage_percentage"] == pytest.approx(100 * 80.8 * 40 / (40 * 80.8))
+
+    data["team_boxscore"] = pd.concat([teams, pd.DataFrame([boxscore(2, "A", "C", 90), boxscore(2, "C", "A", 60)])])
+    aggregates.update_season_stats(2024)
+    stats = aggregates.team_season_stats(2024).set_index("team_name")
+    assert stats["games"].to_dict() == {"A": 2, "B": 1, "C": 1}
+    assert stats.loc["A", "points_per_game"] == 85
+    assert stats.loc["C", "opponent_points"] == 90
+    assert aggregates.team_season_stats(2024, career=True).set_index("team_name").loc["A", "seasons"] == 1
+    aggregates.clear_season_stats()
+
+
+def test_enrich_pbp():
+    schedule = pd.DataFrame({"fiba_id": [20, 10], "home_team_id": [1, 3], "away_team_id": [2, 1],
+                             "home_team_name": ["A", "C"], "away_team_name": ["B", "A"],
+                             "venue_name": ["Arena", "Dome"], "start_time_utc": ["2024-05-01T23:00:00Z"] * 2})
+    boxscore = pd.DataFrame({"game_id": [10, 10, 20, 20], "team_name": ["A", "C", "A", "B"],
+                             "player_name": ["Ann", "Cal", "Ann", "Bob"], "player_position": ["G", "F", "G", "C"],
+                             "starter": [True, False, False, True]})
+    pbp = pd.DataFrame({"game_id": [10, 10, 20, 20, 30], "season": 2024, "team_id": [1, 3, 2, 1, 1],
+                        "player_name": ["Ann", "Cal", "Bob", "Zed", "Ann"]})
+
+    df = joins.enrich_pbp(pbp, schedule, boxscore)
+    assert df["team_name"].tolist()[:4] == ["A", "C", "B", "A"]
+    assert pd.isna(df["team_name"].iloc[4])
+    assert df["is_home"].tolist()[:4] == [False, True, False, True]
+    assert df["venue_name"].tolist()[:4] == ["Dome", "Dome", "Arena", "Arena"]
+    assert df["player_position"].tolist()[:3] == ["G", "F", "C"]
+    assert df["starter"].tolist()[:3] == [True, False, True]
+    assert df[["player_position", "starter"]].iloc[3:].isna().all().all()
+    assert df["home_team_id"].dtype == "Int64"
+
+
+def test_join_indexes_of_current_season_expire(monkeypatch):
+    current = datetime.now().year
+    loads = []
+
+    def loader(dataset, frame):
+        def load(seasons):
+            loads.append((dataset, tuple(seasons)))
+            return frame.assign(season=seasons[0])
+        return load
+
+    schedule = pd.DataFrame({"fiba_id": [1], "home_team_id": [1], "away_team_id": [2], "home_team_name": ["A"],
+                             "away_team_name": ["B"], "venue_name": ["Arena"], "start_time_utc": ["2024-05-01"]})
+    boxscore = pd.DataFrame({"game_id": [1], "team_name": ["A"], "player_name": ["Ann"], "player_position": ["G"],
+                             "starter": [True]})
+    monkeypatch.setitem(ceblpy._LOADERS, "schedule", loader("schedule", schedule))
+    monkeypatch.setitem(ceblpy._LOADERS, "player_boxscore", loader("player_boxscore", boxscore))
+    monkeypatch.setitem(memo._options, "ttl", 0)
+    joins.clear_join_indexes()
+
+    for season in (current - 1, current):
+        pbp = pd.DataFrame({"game_id": [1], "season": season, "team_id": [1], "player_name": ["Ann"]})
+        joins.enrich_pbp(pbp)
+        joins.enrich_pbp(pbp)
+    assert [season for dataset, (season,) in loads if dataset == "schedule"] == [current - 1, current, current]
+    joins.clear_join_indexes()
+
+
+def test_shot_chart(monkeypatch):
+    pbp = pd.DataFrame({"season": [2023, 2024, 2024, 2024, 2024], "team_id": [1, 1, 1, 2, 1],
+                        "player_id": [7, 7, 7, 8, 7], "action_type": ["2pt", "3pt", "2pt", "2pt", "freethrow"],
+                        "success": [1, 1, 0, 1, 1], "x": [1.0, 1.5, 9.0, 2.0, None], "y": [1.0, 2.0, 1.0, 3.0, None]})
+    loads = []
+
+    def load(seasons, columns=None):
+        loads.append(seasons)
+        return pbp[pbp["season"].isin(seasons)]
+
+    monkeypatch.setitem(ceblpy._LOADERS, "pbp", load)
+    shots.clear_shot_charts()
+
+    chart = shots.shot_chart([2023, 2024], player_id=7)
+    assert chart[["x", "y", "attempts", "makes", "points"]].values.tolist() == [[2.5, 2.5, 2, 2, 5], [7.5, 2.5, 1, 0, 0]]
+    assert chart["field_goal_percentage"].tolist() == [100, 0]
+    assert shots.shot_chart(2024, team_id=2)["points"].tolist() == [2]
+    assert loads == [[2023, 2024]]
+
+    monkeypatch.setitem(memo._options, "ttl", 0)
+    current = datetime.now().year
+    shots.shot_chart(current)
+    shots.shot_chart([2024, current])
+    assert loads[1:] == [[current], [current]]
+
+    hexes = shots.bin_shots(pbp, bins="hex", size=2)
+    assert hexes["attempts"].sum() == 4
+    assert hexes[["x", "y"]].values.tolist()[0] == pytest.approx([1, 3 ** 0.5])
+    shots.clear_shot_charts()